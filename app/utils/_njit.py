@@ -0,0 +1,26 @@
+"""
+Optional Numba support for the numeric helpers in app.utils.
+
+Numba is not a required dependency. When it is installed, ``njit`` is
+``numba.njit`` and decorated functions are compiled to native code; otherwise
+``njit`` is a no-op decorator and the same functions run as plain Python.
+Likewise ``prange`` is ``numba.prange`` (a parallel loop in functions compiled
+with ``parallel=True``) or the builtin ``range``.
+"""
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit, supporting both @njit and @njit(...)."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+
+        return decorator
@@ -1,56 +1,93 @@
-from typing import Dict, Optional, List, Tuple, Any, Literal # Import Any and Literal
+import logging
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Optional, List, Tuple, Any, Callable, Literal, TypedDict, Union # Import Any and Literal
+
+import numpy as np
+
+from app.utils._njit import njit
+
+# Setup logging
+logger = logging.getLogger(__name__)
 
 # Define the trading signal type
 TradingSignal = Literal['STRONG BUY', 'BUY', 'HOLD', 'SELL', 'STRONG SELL']
 
-def generate_trading_signal(confidence_score: int, direction: str, price: Optional[float],
-                          tech_indicators: Dict[str, Optional[float]]) -> TradingSignal:
-    """
-    Generates a trading signal (STRONG BUY, BUY, HOLD, SELL, STRONG SELL) based on
-    confidence score, direction, and technical indicators.
+# Canonical direction and signal strings, interned so that comparisons against
+# them (here and in callers that import them) are identity checks
+BULLISH = sys.intern('bullish')
+BEARISH = sys.intern('bearish')
+NEUTRAL = sys.intern('neutral')
 
-    Args:
-        confidence_score: Overall confidence score (0-100)
-        direction: Predicted direction ('bullish', 'bearish', or 'neutral')
-        price: Current price of the asset (can be None)
-        tech_indicators: Dictionary of technical indicator values
+_STRONG_BUY = sys.intern('STRONG BUY')
+_BUY = sys.intern('BUY')
+_HOLD = sys.intern('HOLD')
+_SELL = sys.intern('SELL')
+_STRONG_SELL = sys.intern('STRONG SELL')
 
-    Returns:
-        A trading signal as a string
+# A supporting/conflicting note: either a ready string or a (template, args) pair
+# that is only %-formatted when the notes are returned
+Note = Union[str, Tuple[str, Tuple[Any, ...]]]
+
+class ConfidenceResult(TypedDict):
     """
-    # Default to HOLD if we can't make a confident decision
-    signal: TradingSignal = 'HOLD'
-
-    # Get key indicators for additional signal refinement
-    rsi = tech_indicators.get('rsi')
-    adx = tech_indicators.get('adx')
-    macd = tech_indicators.get('macd')
-    macd_signal = tech_indicators.get('macd_signal')
-    macd_hist = tech_indicators.get('macd_hist')
-    ema_9 = tech_indicators.get('ema_9')
-    ema_21 = tech_indicators.get('ema_21')
-    ema_55 = tech_indicators.get('ema_55')
-    plus_di = tech_indicators.get('adx_plus_di')
-    minus_di = tech_indicators.get('adx_minus_di')
+    Structured confidence data returned by the confidence scorers.
 
+    Kept as a plain dict at runtime: callers index it, call .get() on it and
+    cache it as part of the technical analysis results.
+    """
+    overall_score: int
+    direction: str
+    signal: TradingSignal
+    factor_scores: Dict[str, float]
+    supporting_indicators: List[str]
+    conflicting_indicators: List[str]
+    indicator_agreement: float
+
+# Integer codes used by the trading signal kernel
+_DIRECTION_CODES: Dict[str, int] = {BULLISH: 1, BEARISH: 2}  # anything else is neutral (0)
+_SIGNALS_BY_CODE: Tuple[TradingSignal, ...] = (_STRONG_SELL, _SELL, _HOLD, _BUY, _STRONG_BUY)
+
+# Direction for the sign of (bullish votes - bearish votes)
+_DIRECTION_BY_SIGN = {1: BULLISH, -1: BEARISH, 0: NEUTRAL}
+
+# Indicators read by generate_trading_signal, in the kernel's argument order
+_SIGNAL_INDICATORS = ('rsi', 'adx', 'macd', 'macd_signal', 'macd_hist',
+                      'ema_9', 'ema_21', 'ema_55', 'adx_plus_di', 'adx_minus_di')
+
+_NAN = float('nan')
+
+@njit("int64(float64, int64, float64, float64, float64, float64, float64, float64,"
+      " float64, float64, float64, float64, float64)", cache=True)
+def _trading_signal_code(confidence_score, direction_code, price, rsi, adx, macd, macd_signal,
+                         macd_hist, ema_9, ema_21, ema_55, plus_di, minus_di):
+    """
+    Numeric core of generate_trading_signal.
+
+    Missing values are passed as NaN (x != x) and the result is an index into
+    _SIGNALS_BY_CODE, so the function compiles with numba when it is installed.
+    """
     # Count strong bullish/bearish signals to determine final signal
-    bullish_signals = 0
-    bearish_signals = 0
-
-    # 1. Base signal on direction and confidence (lower thresholds for more varied signals)
-    if direction == 'bullish':
-        if confidence_score >= 60:  # Lowered from 70
-            bullish_signals += 2  # Strong signal
-        elif confidence_score >= 30:  # Lowered from 40
-            bullish_signals += 1  # Moderate signal
-    elif direction == 'bearish':
-        if confidence_score >= 60:  # Lowered from 70
-            bearish_signals += 2  # Strong signal
-        elif confidence_score >= 30:  # Lowered from 40
-            bearish_signals += 1  # Moderate signal
+    bullish_signals = 0.0
+    bearish_signals = 0.0
+
+    # 1. Base signal on direction and confidence
+    # Lower thresholds for more varied signals
+    if confidence_score >= 60:  # Lowered from 70
+        strength = 2.0  # Strong signal
+    elif confidence_score >= 30:  # Lowered from 40
+        strength = 1.0  # Moderate signal
+    else:
+        strength = 0.0
+
+    if direction_code == 1:
+        bullish_signals += strength
+    elif direction_code == 2:
+        bearish_signals += strength
 
     # 2. RSI conditions
-    if rsi is not None:
+    if rsi == rsi:
         if rsi <= 30:  # Oversold (increased from 20)
             bullish_signals += 1
         elif rsi <= 20:  # Extremely oversold
@@ -61,29 +98,30 @@ def generate_trading_signal(confidence_score: int, direction: str, price: Option
             bearish_signals += 2
 
     # 3. MACD conditions
-    if all(x is not None for x in [macd, macd_signal, macd_hist]):
+    if macd == macd and macd_signal == macd_signal and macd_hist == macd_hist:
+        abs_macd = abs(macd)
         # MACD crossover (bullish when MACD crosses above signal)
         if macd > macd_signal:
             bullish_signals += 1
             # Extra point if histogram is positive and increasing
-            if macd_hist > 0 and macd_hist > 0.1 * abs(macd):  # Significant positive histogram
+            if macd_hist > 0 and macd_hist > 0.1 * abs_macd:  # Significant positive histogram
                 bullish_signals += 1
         # MACD crossover (bearish when MACD crosses below signal)
         elif macd < macd_signal:
             bearish_signals += 1
             # Extra point if histogram is negative and decreasing
-            if macd_hist < 0 and abs(macd_hist) > 0.1 * abs(macd):  # Significant negative histogram
+            if macd_hist < 0 and -macd_hist > 0.1 * abs_macd:  # Significant negative histogram
                 bearish_signals += 1
 
         # If MACD and signal are very close, reduce the signal strength
-        if abs(macd - macd_signal) < 0.05 * abs(macd) and macd != 0:
+        if abs_macd > 0 and abs(macd - macd_signal) < 0.05 * abs_macd:
             if macd > macd_signal:
                 bullish_signals -= 0.5  # Reduce bullish signal (MACD barely above signal)
             else:
                 bearish_signals -= 0.5  # Reduce bearish signal (MACD barely below signal)
 
     # 4. EMA conditions
-    if all(x is not None for x in [ema_9, ema_21, ema_55]):
+    if ema_9 == ema_9 and ema_21 == ema_21 and ema_55 == ema_55:
         # Bullish EMA alignment
         if ema_9 > ema_21 > ema_55:
             bullish_signals += 2
@@ -96,14 +134,14 @@ def generate_trading_signal(confidence_score: int, direction: str, price: Option
             bearish_signals += 1
 
         # Price position relative to EMAs
-        if price is not None:
+        if price == price:
             if price > ema_55:  # Price above long-term EMA
                 bullish_signals += 1
             elif price < ema_55:  # Price below long-term EMA
                 bearish_signals += 1
 
     # 5. ADX conditions
-    if all(x is not None for x in [adx, plus_di, minus_di]):
+    if adx == adx and plus_di == plus_di and minus_di == minus_di:
         # Strong trend gives more weight to the direction
         if adx >= 25:  # Strong trend
             if plus_di > minus_di:  # Bullish trend
@@ -118,101 +156,329 @@ def generate_trading_signal(confidence_score: int, direction: str, price: Option
     # 6. Determine final signal based on bullish vs bearish signals
     signal_strength = bullish_signals - bearish_signals
 
-    if signal_strength >= 6:  # Very strong bullish
-        signal = 'STRONG BUY'
-    elif signal_strength >= 3:  # Moderately bullish
-        signal = 'BUY'
-    elif signal_strength <= -7:  # Very strong bearish (increased threshold for STRONG SELL)
-        signal = 'STRONG SELL'
-    elif signal_strength <= -4:  # Moderately bearish (increased threshold for SELL)
-        signal = 'SELL'
-    elif signal_strength >= 1:  # Slightly bullish
-        signal = 'HOLD'
-        # Lean bullish but not enough for BUY
-    elif signal_strength <= -1:  # Slightly bearish
-        signal = 'HOLD'
-        # Lean bearish but not enough for SELL
-    else:  # Truly neutral (0)
-        signal = 'HOLD'
+    # The signal code counts the thresholds the strength clears:
+    #   <= -7 STRONG SELL (0), <= -4 SELL (1), otherwise HOLD (2), >= 3 BUY (3), >= 6 STRONG BUY (4)
+    # (STRONG SELL and SELL use higher thresholds than their bullish counterparts)
+    signal = ((signal_strength > -7) + (signal_strength > -4)
+              + (signal_strength >= 3) + (signal_strength >= 6))
 
     # 7. Special case: extremely oversold/overbought conditions
-    if rsi is not None:
+    if rsi == rsi:
         # Extremely oversold but only override if not already STRONG SELL
-        if rsi <= 20 and signal not in ['STRONG SELL', 'SELL']:
+        if rsi <= 20 and signal > 1:
             # If ADX confirms with bullish trend, make it STRONG BUY
-            if adx is not None and adx >= 25 and plus_di is not None and minus_di is not None and plus_di > minus_di:
-                signal = 'STRONG BUY'
+            if adx >= 25 and plus_di > minus_di:
+                signal = 4
             # Otherwise just BUY on extreme oversold
             else:
-                signal = 'BUY'
+                signal = 3
 
         # Extremely overbought but only override if not already STRONG BUY
-        elif rsi >= 80 and signal not in ['STRONG BUY', 'BUY']:
+        elif rsi >= 80 and signal < 3:
             # If ADX confirms with bearish trend, make it STRONG SELL
-            if adx is not None and adx >= 25 and plus_di is not None and minus_di is not None and minus_di > plus_di:
-                signal = 'STRONG SELL'
+            if adx >= 25 and minus_di > plus_di:
+                signal = 0
             # Otherwise just SELL on extreme overbought
             else:
-                signal = 'SELL'
+                signal = 1
 
     return signal
 
-def calculate_confidence_score(
+# The kernel is pure, and repeated scans of a symbol call it with the same inputs.
+# Values are cached exactly as given (no rounding), so a hit always matches a fresh call.
+_cached_trading_signal_code = lru_cache(maxsize=4096)(_trading_signal_code)
+
+def generate_trading_signal(confidence_score: int, direction: str, price: Optional[float],
+                          tech_indicators: Dict[str, Optional[float]]) -> TradingSignal:
+    """
+    Generates a trading signal (STRONG BUY, BUY, HOLD, SELL, STRONG SELL) based on
+    confidence score, direction, and technical indicators.
+
+    Args:
+        confidence_score: Overall confidence score (0-100)
+        direction: Predicted direction ('bullish', 'bearish', or 'neutral')
+        price: Current price of the asset (can be None)
+        tech_indicators: Dictionary of technical indicator values
+
+    Returns:
+        A trading signal as a string
+    """
+    # Missing indicators (None) are passed to the kernel as NaN
+    indicators = [_NAN if value is None else value
+                  for value in map(tech_indicators.get, _SIGNAL_INDICATORS)]
+    code = _cached_trading_signal_code(confidence_score, _DIRECTION_CODES.get(direction, 0),
+                                       _NAN if price is None else price, *indicators)
+    return _SIGNALS_BY_CODE[code]
+
+# Weights of the factor scores in the overall confidence score. Market context and
+# Twitter sentiment enter the overall score through their score adjustments, and the
+# indicator agreement score (0-10 points) is added on top of the weighted sum.
+# The order is shared with the batch scorer.
+_FACTOR_WEIGHTS: Tuple[Tuple[str, float], ...] = (
+    ('rsi', 0.08),           # RSI contribution (8%) - Reduced from 10%
+    ('macd', 0.08),          # MACD contribution (8%) - Reduced from 10%
+    ('bb', 0.08),            # Bollinger Bands contribution (8%) - Reduced from 10%
+    ('sma', 0.08),           # SMA contribution (8%) - Reduced from 10%
+    ('adx', 0.08),           # ADX contribution (8%) - Reduced from 10%
+    ('ema', 0.08),           # EMA contribution (8%) - Reduced from 10%
+    ('data_quality', 0.10),  # Data quality contribution (10%)
+)
+# Weight values in factor order, followed by the weight of the agreement score
+_FACTOR_WEIGHT_VALUES: Tuple[float, ...] = tuple(weight for _, weight in _FACTOR_WEIGHTS) + (1.0,)
+
+@njit("int64(float64)", cache=True)
+def _clamp100(x):
+    """Rounds a score to the nearest integer (ties to even, like round()) and clamps it to 0-100."""
+    return 0 if x <= 0 else 100 if x >= 100 else round(x)
+
+@njit("int64(UniTuple(float64, 8), UniTuple(float64, 8), float64)", cache=True)
+def _confidence_core(factor_scores, weights, adjustment):
+    """
+    Numeric core of the overall confidence score.
+
+    Takes the factor scores (in _FACTOR_WEIGHTS order, followed by the agreement
+    score) and returns their weighted sum plus the context/Twitter adjustment,
+    rounded and clamped to 0-100. Compiled with Numba when it is available.
+    """
+    overall_score = 0.0
+    for i in range(len(factor_scores)):
+        overall_score += factor_scores[i] * weights[i]
+    overall_score += adjustment
+    return _clamp100(overall_score)
+
+@dataclass(slots=True)
+class FactorScores:
+    """
+    Individual factor confidence scores for a single asset.
+
+    The technical factors are always scored; market_context and twitter_sentiment
+    stay None unless that data was available and processed successfully.
+    """
+    rsi: float = 0
+    macd: float = 0
+    bb: float = 0
+    sma: float = 0
+    adx: float = 0
+    ema: float = 0
+    data_quality: float = 0
+    market_context: Optional[float] = None
+    twitter_sentiment: Optional[float] = None
+
+    def weighted_factors(self) -> Tuple[float, ...]:
+        """Returns the scores that enter the weighted sum, in _FACTOR_WEIGHTS order."""
+        return (float(self.rsi), float(self.macd), float(self.bb), float(self.sma),
+                float(self.adx), float(self.ema), float(self.data_quality))
+
+    def to_dict(self) -> Dict[str, float]:
+        """Returns the scores as the factor_scores dictionary of the confidence result."""
+        factor_scores = {
+            'rsi': self.rsi, 'macd': self.macd, 'bb': self.bb, 'sma': self.sma,
+            'adx': self.adx, 'ema': self.ema, 'data_quality': self.data_quality
+        }
+        if self.market_context is not None:
+            factor_scores['market_context'] = self.market_context
+        if self.twitter_sentiment is not None:
+            factor_scores['twitter_sentiment'] = self.twitter_sentiment
+        return factor_scores
+
+def _agreement_percent(agreeing_votes: int, total_votes: int) -> int:
+    """
+    Returns agreeing_votes / total_votes as a whole percentage, using integer
+    arithmetic only. Ties round to even, matching round(agreeing_votes / total_votes, 2).
+    """
+    percent, remainder = divmod(agreeing_votes * 100, total_votes)
+    if 2 * remainder > total_votes or (2 * remainder == total_votes and percent % 2):
+        percent += 1
+    return percent
+
+# Minimum number of available indicators for a confidence score; sparser data
+# (new listings, stale feeds) gets _insufficient_data_result instead
+MIN_INDICATORS_FOR_SIGNAL = 4
+
+# Indicators counted by the data quality score (also the batch scorer's input columns)
+_EXPECTED_INDICATORS = ('rsi', 'macd', 'macd_signal', 'macd_hist', 'bb_upper', 'bb_middle', 'bb_lower',
+                        'sma_50', 'adx', 'adx_plus_di', 'adx_minus_di', 'ema_9', 'ema_21', 'ema_55')
+
+# Data quality score (0-10 points) by number of available indicators
+_DATA_QUALITY_SCORES = tuple(min(10, (available / len(_EXPECTED_INDICATORS)) * 10)
+                             for available in range(len(_EXPECTED_INDICATORS) + 1))
+
+def _compare(a: float, b: float) -> int:
+    """-1, 0 or 1 as a is below, equal to or above b; bool() keeps NumPy scalars subtractable."""
+    return bool(a > b) - bool(a < b)
+
+# EMA scoring rows: (score points, bullish votes, bearish votes, tagged note or None)
+_EmaRow = Tuple[int, int, int, Optional[Tuple[str, str]]]
+
+# EMA alignment by 3 * _compare(EMA9, EMA21) + _compare(EMA21, EMA55) + 4
+_EMA_ALIGNMENT: Tuple[_EmaRow, ...] = (
+    (10, 0, 2, (BEARISH, 'Strong bearish EMA alignment (9 < 21 < 55)')),  # 9 < 21 < 55
+    (5, 0, 1, (BEARISH, 'Short-term bearish (EMA9 < EMA21)')),           # 9 < 21 == 55
+    (5, 0, 1, (BEARISH, 'Short-term bearish (EMA9 < EMA21)')),           # 9 < 21 > 55
+    (0, 0, 0, None),                                                     # 9 == 21
+    (0, 0, 0, None),
+    (0, 0, 0, None),
+    (5, 1, 0, (BULLISH, 'Short-term bullish (EMA9 > EMA21)')),           # 9 > 21 < 55
+    (5, 1, 0, (BULLISH, 'Short-term bullish (EMA9 > EMA21)')),           # 9 > 21 == 55
+    (10, 2, 0, (BULLISH, 'Strong bullish EMA alignment (9 > 21 > 55)')),  # 9 > 21 > 55
+)
+
+# Price position relative to EMA55 by cmp(price, EMA55) + 1
+_PRICE_VS_EMA55: Tuple[_EmaRow, ...] = (
+    (5, 0, 1, (BEARISH, 'Price below EMA55 (bearish)')),
+    (0, 0, 0, None),
+    (5, 1, 0, (BULLISH, 'Price above EMA55 (bullish)')),
+)
+
+# Fear & Greed trend directions
+_RISING_TRENDS = ('increasing', 'strongly_increasing')
+_FALLING_TRENDS = ('decreasing', 'strongly_decreasing')
+_FEAR_TRENDS = frozenset(('extreme_fear', 'fear'))
+_GREED_TRENDS = frozenset(('extreme_greed', 'greed'))
+
+# (market points, confidence adjustment) for a Fear & Greed trend, keyed by
+# (trend supports the direction, trend is moving the strong way)
+_FEAR_GREED_TREND_SCORES: Dict[Tuple[bool, bool], Tuple[int, int]] = {
+    (True, True): (5, 5),     # Fear rising under a bullish call / greed rising under a bearish one
+    (True, False): (3, 3),    # Same pairing, trend stable or easing
+    (False, True): (0, -5),   # Greed rising under a bullish call / fear fading under a bearish one
+    (False, False): (1, -2),  # Conflicting pairing that is not getting stronger
+}
+
+# Fear & Greed scoring for a bullish/bearish signal, keyed by (direction, F&G bucket):
+# (market score points, score adjustment, note template, whether the note supports the signal).
+# Fear is contrarian-bullish and greed contrarian-bearish.
+_FEAR_GREED_SCORES: Dict[Tuple[str, str], Tuple[int, int, Optional[str], bool]] = {
+    (BULLISH, 'extreme_greed'): (0, -10, "Context: Extreme Greed (%d) conflicts with bullish signal", False),
+    (BULLISH, 'greed'): (2, -5, "Context: Greed (%d) slightly conflicts with bullish signal", False),
+    (BULLISH, 'extreme_fear'): (10, 10, "Context: Extreme Fear (%d) strongly supports bullish signal (contrarian)", True),
+    (BULLISH, 'fear'): (7, 5, "Context: Fear (%d) supports bullish signal (contrarian)", True),
+    (BULLISH, 'neutral'): (5, 0, None, False),
+    (BEARISH, 'extreme_greed'): (10, 10, "Context: Extreme Greed (%d) strongly supports bearish signal", True),
+    (BEARISH, 'greed'): (7, 5, "Context: Greed (%d) supports bearish signal", True),
+    (BEARISH, 'extreme_fear'): (0, -10, "Context: Extreme Fear (%d) conflicts with bearish signal (contrarian)", False),
+    (BEARISH, 'fear'): (2, -5, "Context: Fear (%d) slightly conflicts with bearish signal (contrarian)", False),
+    (BEARISH, 'neutral'): (5, 0, None, False),
+}
+
+# Market cap change scoring, keyed by (direction, movement bucket) where the buckets are
+# strong down (< -5%), down (< -2%), flat, up (> 2%) and strong up (> 5%):
+# (market score points, score adjustment, note template, whether the note supports the signal).
+# For a neutral signal only the size of the move matters.
+_MARKET_CAP_SCORES: Dict[Tuple[str, int], Tuple[int, int, Optional[str], bool]] = {
+    (BULLISH, 0): (0, -10, "Context: Strong market down (%.2f%%) conflicts with bullish signal", False),
+    (BULLISH, 1): (2, -5, "Context: Market down (%.2f%%) conflicts with bullish signal", False),
+    (BULLISH, 2): (5, 0, None, False),
+    (BULLISH, 3): (7, 5, "Context: Market up (%.2f%%) supports bullish signal", True),
+    (BULLISH, 4): (10, 10, "Context: Strong market up (%.2f%%) strongly supports bullish signal", True),
+    (BEARISH, 0): (10, 10, "Context: Strong market down (%.2f%%) strongly supports bearish signal", True),
+    (BEARISH, 1): (7, 5, "Context: Market down (%.2f%%) supports bearish signal", True),
+    (BEARISH, 2): (5, 0, None, False),
+    (BEARISH, 3): (2, -5, "Context: Market up (%.2f%%) conflicts with bearish signal", False),
+    (BEARISH, 4): (0, -10, "Context: Strong market up (%.2f%%) conflicts with bearish signal", False),
+    (NEUTRAL, 0): (5, 0, None, False),
+    (NEUTRAL, 1): (3, 0, None, False),
+    (NEUTRAL, 2): (3, 0, None, False),
+    (NEUTRAL, 3): (3, 0, None, False),
+    (NEUTRAL, 4): (5, 0, None, False),
+}
+
+# Key of the _TWITTER_SCORES fallback entries, for any sentiment a direction does not list
+_OTHER_SENTIMENT = object()
+
+# Twitter sentiment scoring, keyed by (direction, overall sentiment): (twitter score points,
+# score adjustment, note, whether the note supports the signal). The _OTHER_SENTIMENT entry
+# covers any sentiment not listed; with a neutral signal any clear sentiment is valuable.
+_TWITTER_SCORES: Dict[Tuple[str, object], Tuple[int, int, Optional[str], bool]] = {
+    (BULLISH, BULLISH): (15, 10, "Bullish Twitter sentiment strongly supports bullish technical signals", True),
+    (BULLISH, BEARISH): (0, -10, "Bearish Twitter sentiment conflicts with bullish technical signals", False),
+    (BULLISH, _OTHER_SENTIMENT): (5, 0, None, False),
+    (BEARISH, BEARISH): (15, 10, "Bearish Twitter sentiment strongly supports bearish technical signals", True),
+    (BEARISH, BULLISH): (0, -10, "Bullish Twitter sentiment conflicts with bearish technical signals", False),
+    (BEARISH, _OTHER_SENTIMENT): (5, 0, None, False),
+    (NEUTRAL, NEUTRAL): (5, 0, "Neutral Twitter sentiment aligns with neutral technical signals", True),
+    (NEUTRAL, _OTHER_SENTIMENT): (10, 0, None, False),
+}
+
+def _score_factors(
     tech_indicators: Dict[str, Optional[float]],
-    price: Optional[float], # Allow price to be None
-    market_context: Optional[Dict[str, Any]] = None, # Add market context parameter
-    twitter_sentiment: Optional[Dict[str, Any]] = None # Add Twitter sentiment parameter
-) -> Dict[str, any]:
+    price: Optional[float],
+    market_context: Optional[Dict[str, Any]] = None,
+    twitter_sentiment: Optional[Dict[str, Any]] = None,
+    build_notes: bool = True
+) -> Optional[Tuple[FactorScores, str, float, int, int, List[Note], List[Note]]]:
     """
-    Calculate a confidence score (0-100) for predictions based on technical indicators,
-    broader market context, and Twitter sentiment analysis.
+    Scores the individual confidence factors for a single asset.
+
+    This is the per-asset part of calculate_confidence_score: it scores every
+    technical indicator, works out the direction from the indicator votes and
+    evaluates market context and Twitter sentiment. Combining the factor scores
+    into the overall score is left to the caller, so the same analysis can feed
+    both the single-asset and the batch scorer.
 
     Args:
         tech_indicators: Dictionary of technical indicator values.
         price: Current price of the asset. Can be None if unavailable.
         market_context: Optional dictionary containing 'global_market' and 'fear_greed' data.
         twitter_sentiment: Optional dictionary containing Twitter sentiment data from Perplexity.
+        build_notes: Whether to build the supporting/conflicting notes. When False the
+            value-bearing notes are not formatted and the returned lists are incomplete.
 
     Returns:
-        Dictionary containing:
-        - overall_score: 0-100 confidence score.
-        - direction: 'bullish', 'bearish', or 'neutral'.
-        - factor_scores: Dictionary of individual factor confidence scores.
-        - supporting_indicators: List of indicators supporting the predicted direction.
-        - conflicting_indicators: List of indicators against the predicted direction.
-        - indicator_agreement: Ratio of agreeing indicators to total directional indicators.
+        A tuple of (factor_scores, direction, agreement_ratio, agreement_percent,
+        adjustment, supporting_indicators, conflicting_indicators), where
+        agreement_percent is the agreement ratio as a whole percentage and
+        adjustment is the combined market context and Twitter sentiment score adjustment.
+        The indicator lists hold unformatted notes; see _format_notes.
+        None if fewer than MIN_INDICATORS_FOR_SIGNAL indicators are available.
     """
-    scores = {}
-    supporting = []
-    conflicting = []
+    scores = FactorScores()
+    # Technical notes, tagged with the direction they point to
+    supporting: List[Tuple[str, str]] = []
+    conflicting: List[str] = []
+    add_note = supporting.append
+    add_conflict = conflicting.append
 
     # Track indicator votes (bullish/bearish count)
-    votes = {'bullish': 0, 'bearish': 0, 'neutral': 0}
+    votes: Dict[str, int] = {BULLISH: 0, BEARISH: 0, NEUTRAL: 0}
+
+    # Read every indicator once
+    get = tech_indicators.get
+    rsi = get('rsi')
+    macd, macd_signal, macd_hist = get('macd'), get('macd_signal'), get('macd_hist')
+    bb_upper, bb_middle, bb_lower = get('bb_upper'), get('bb_middle'), get('bb_lower')
+    sma_50 = get('sma_50')
+    adx, plus_di, minus_di = get('adx'), get('adx_plus_di'), get('adx_minus_di')
+    ema_9, ema_21, ema_55 = get('ema_9'), get('ema_21'), get('ema_55')
+
+    # Count how many of the expected indicators are available; with too few of
+    # them the score would be meaningless, so skip the analysis entirely
+    available = ((rsi is not None) + (macd is not None) + (macd_signal is not None) + (macd_hist is not None)
+                 + (bb_upper is not None) + (bb_middle is not None) + (bb_lower is not None) + (sma_50 is not None)
+                 + (adx is not None) + (plus_di is not None) + (minus_di is not None)
+                 + (ema_9 is not None) + (ema_21 is not None) + (ema_55 is not None))
+    if available < MIN_INDICATORS_FOR_SIGNAL:
+        return None
 
     # 1. RSI Analysis (0-20 points)
-    rsi = tech_indicators.get('rsi')
     if rsi is not None:
         if rsi < 30:  # Oversold
-            scores['rsi'] = min(20, (30 - rsi) * 1.5)  # More oversold = higher confidence
-            votes['bullish'] += 1
-            supporting.append('RSI oversold (<30)')
+            scores.rsi = min(20, (30 - rsi) * 1.5)  # More oversold = higher confidence
+            votes[BULLISH] += 1
+            add_note((BULLISH, 'RSI oversold (<30)'))
         elif rsi > 70:  # Overbought
-            scores['rsi'] = min(20, (rsi - 70) * 1.5)  # More overbought = higher confidence
-            votes['bearish'] += 1
-            supporting.append('RSI overbought (>70)')
+            scores.rsi = min(20, (rsi - 70) * 1.5)  # More overbought = higher confidence
+            votes[BEARISH] += 1
+            add_note((BEARISH, 'RSI overbought (>70)'))
         else:
             # Neutral zone - less confidence contribution from RSI itself
-            scores['rsi'] = max(0, 10 - abs(50 - rsi) * 0.2) # Score higher closer to 50
-            votes['neutral'] += 1
+            scores.rsi = max(0, 10 - abs(50 - rsi) * 0.2) # Score higher closer to 50
+            votes[NEUTRAL] += 1
     else:
-        scores['rsi'] = 0
+        scores.rsi = 0
 
     # 2. MACD Analysis (0-25 points)
-    macd = tech_indicators.get('macd')
-    macd_signal = tech_indicators.get('macd_signal')
-    macd_hist = tech_indicators.get('macd_hist')
-
-    if all(x is not None for x in [macd, macd_signal, macd_hist]):
+    if macd is not None and macd_signal is not None and macd_hist is not None:
         # Score based on histogram magnitude (stronger divergence/convergence)
         hist_score = min(15, abs(macd_hist) * 50) # Scaled based on typical histogram values
 
@@ -220,81 +486,71 @@ def calculate_confidence_score(
         # Smaller difference means closer to crossover
         cross_proximity_score = max(0, 10 - abs(macd - macd_signal) * 20) # Scaled
 
-        scores['macd'] = hist_score + cross_proximity_score
+        scores.macd = hist_score + cross_proximity_score
 
         # Determine direction based on MACD line vs Signal line AND histogram sign
         if macd > macd_signal and macd_hist > 0:
-            votes['bullish'] += 1
-            supporting.append('MACD bullish crossover/positive hist')
+            votes[BULLISH] += 1
+            add_note((BULLISH, 'MACD bullish crossover/positive hist'))
         elif macd < macd_signal and macd_hist < 0:
-            votes['bearish'] += 1
-            supporting.append('MACD bearish crossover/negative hist')
+            votes[BEARISH] += 1
+            add_note((BEARISH, 'MACD bearish crossover/negative hist'))
         else: # Divergence or conflicting signals within MACD
-             votes['neutral'] += 1 # Or could assign weak vote based on dominant signal
+             votes[NEUTRAL] += 1 # Or could assign weak vote based on dominant signal
              # Add conflicting note if needed
-             if macd > macd_signal and macd_hist < 0: conflicting.append("MACD line/hist divergence")
-             if macd < macd_signal and macd_hist > 0: conflicting.append("MACD line/hist divergence")
+             if macd > macd_signal and macd_hist < 0: add_conflict("MACD line/hist divergence")
+             if macd < macd_signal and macd_hist > 0: add_conflict("MACD line/hist divergence")
 
     else:
-        scores['macd'] = 0
+        scores.macd = 0
 
     # 3. Bollinger Bands Analysis (0-25 points)
-    bb_upper = tech_indicators.get('bb_upper')
-    bb_middle = tech_indicators.get('bb_middle')
-    bb_lower = tech_indicators.get('bb_lower')
-
-    if all(x is not None for x in [bb_upper, bb_middle, bb_lower]) and price is not None:
+    if bb_upper is not None and bb_middle is not None and bb_lower is not None and price is not None:
         band_width = bb_upper - bb_lower
         if band_width > 1e-6: # Avoid division by zero if bands are identical
             position = (price - bb_lower) / band_width  # 0 = at lower band, 1 = at upper band
 
             # Score based on extremes (near bands = higher confidence for reversal)
             if position < 0.1:  # Very near lower band
-                scores['bb'] = min(25, (0.1 - position) * 250) # Stronger score closer to edge
-                votes['bullish'] += 1 # Potential reversal buy signal
-                supporting.append('Price near lower Bollinger Band')
+                scores.bb = min(25, (0.1 - position) * 250) # Stronger score closer to edge
+                votes[BULLISH] += 1 # Potential reversal buy signal
+                add_note((BULLISH, 'Price near lower Bollinger Band'))
             elif position > 0.9:  # Very near upper band
-                scores['bb'] = min(25, (position - 0.9) * 250) # Stronger score closer to edge
-                votes['bearish'] += 1 # Potential reversal sell signal
-                supporting.append('Price near upper Bollinger Band')
+                scores.bb = min(25, (position - 0.9) * 250) # Stronger score closer to edge
+                votes[BEARISH] += 1 # Potential reversal sell signal
+                add_note((BEARISH, 'Price near upper Bollinger Band'))
             else:
                 # Score higher closer to middle band (less extreme)
-                scores['bb'] = max(0, 10 - abs(0.5 - position) * 20)
-                votes['neutral'] += 1
+                scores.bb = max(0, 10 - abs(0.5 - position) * 20)
+                votes[NEUTRAL] += 1
         else:
-            scores['bb'] = 0 # Bands too narrow to be useful
+            scores.bb = 0 # Bands too narrow to be useful
     else:
-        scores['bb'] = 0
+        scores.bb = 0
 
     # 4. SMA Analysis (0-20 points)
-    sma_50 = tech_indicators.get('sma_50')
-
     if sma_50 is not None and price is not None:
         # Calculate % difference from SMA
         perc_diff = abs(price - sma_50) / sma_50 * 100 if sma_50 != 0 else 0
 
         # Score higher for clear breaks, lower for price near SMA (indecision)
         # Max score if price is > 5% away, min score if price is exactly at SMA
-        scores['sma'] = min(20, perc_diff * 4)
+        scores.sma = min(20, perc_diff * 4)
 
         # Determine direction
         if price > sma_50:
-            votes['bullish'] += 1
-            supporting.append('Price > SMA 50')
+            votes[BULLISH] += 1
+            add_note((BULLISH, 'Price > SMA 50'))
         elif price < sma_50:
-            votes['bearish'] += 1
-            supporting.append('Price < SMA 50')
+            votes[BEARISH] += 1
+            add_note((BEARISH, 'Price < SMA 50'))
         else:
-            votes['neutral'] += 1
+            votes[NEUTRAL] += 1
     else:
-        scores['sma'] = 0
+        scores.sma = 0
 
     # 5. ADX Analysis (0-20 points)
-    adx = tech_indicators.get('adx')
-    plus_di = tech_indicators.get('adx_plus_di')
-    minus_di = tech_indicators.get('adx_minus_di')
-
-    if all(x is not None for x in [adx, plus_di, minus_di]):
+    if adx is not None and plus_di is not None and minus_di is not None:
         # ADX strength score (0-15 points)
         # ADX < 20: weak trend, 20-40: moderate trend, > 40: strong trend
         if adx < 20:
@@ -308,70 +564,61 @@ def calculate_confidence_score(
             trend_strength_desc = "Strong"
 
         # Determine trend direction based on DI+ vs DI-
-        di_diff = abs(plus_di - minus_di)
-        di_diff_pct = di_diff / ((plus_di + minus_di) / 2) * 100 if (plus_di + minus_di) > 0 else 0
+        # Difference relative to the DI average; doubling the difference instead of
+        # halving the sum gives the same bits without the extra division. DIs are
+        # non-negative, so a zero sum means a zero difference and the clamp yields 0
+        di_sum = max(plus_di + minus_di, 1e-12)
+        di_diff_pct = abs(plus_di - minus_di) * 2 / di_sum * 100
 
         # Add points for clear directional movement (0-5 points)
         # The larger the difference between DI+ and DI-, the clearer the trend direction
         directional_clarity = min(5, di_diff_pct / 10)  # Cap at 5 points
 
         if plus_di > minus_di:
-            votes['bullish'] += 1
+            votes[BULLISH] += 1
             if di_diff_pct > 20:  # Very clear bullish trend
-                votes['bullish'] += 1  # Extra vote for strong directional clarity
-                supporting.append(f'Strong ADX bullish signal (DI+ > DI- by {di_diff_pct:.1f}%)')
+                votes[BULLISH] += 1  # Extra vote for strong directional clarity
+                if build_notes:
+                    add_note((BULLISH, f'Strong ADX bullish signal (DI+ > DI- by {di_diff_pct:.1f}%)'))
             else:
-                supporting.append(f'ADX bullish (DI+ > DI-)')
+                add_note((BULLISH, 'ADX bullish (DI+ > DI-)'))
 
-            if adx > 25:
-                supporting.append(f'{trend_strength_desc} trend (ADX={adx:.1f})')
+            if build_notes and adx > 25:
+                add_note((NEUTRAL, f'{trend_strength_desc} trend (ADX={adx:.1f})'))
 
         elif minus_di > plus_di:
-            votes['bearish'] += 1
+            votes[BEARISH] += 1
             if di_diff_pct > 20:  # Very clear bearish trend
-                votes['bearish'] += 1  # Extra vote for strong directional clarity
-                supporting.append(f'Strong ADX bearish signal (DI- > DI+ by {di_diff_pct:.1f}%)')
+                votes[BEARISH] += 1  # Extra vote for strong directional clarity
+                if build_notes:
+                    add_note((BEARISH, f'Strong ADX bearish signal (DI- > DI+ by {di_diff_pct:.1f}%)'))
             else:
-                supporting.append(f'ADX bearish (DI- > DI+)')
+                add_note((BEARISH, 'ADX bearish (DI- > DI+)'))
 
-            if adx > 25:
-                supporting.append(f'{trend_strength_desc} trend (ADX={adx:.1f})')
+            if build_notes and adx > 25:
+                add_note((NEUTRAL, f'{trend_strength_desc} trend (ADX={adx:.1f})'))
         else:
-            votes['neutral'] += 1
-            supporting.append('No clear trend direction (DI+ ≈ DI-)')
+            votes[NEUTRAL] += 1
+            add_note((NEUTRAL, 'No clear trend direction (DI+ ≈ DI-)'))
 
         # Calculate final ADX score
-        scores['adx'] = min(20, adx_strength + directional_clarity)  # Cap at 20 points
+        scores.adx = min(20, adx_strength + directional_clarity)  # Cap at 20 points
     else:
-        scores['adx'] = 0
+        scores.adx = 0
 
     # 6. EMA Analysis (0-20 points)
     # Check for EMA crossovers and price position relative to EMAs
-    ema_9 = tech_indicators.get('ema_9')
-    ema_21 = tech_indicators.get('ema_21')
-    ema_55 = tech_indicators.get('ema_55')
-
-    ema_score = 0
-    if all(x is not None for x in [ema_9, ema_21, ema_55]) and price is not None:
-        # EMA alignment score (0-10 points)
-        # Bullish: EMA9 > EMA21 > EMA55
-        # Bearish: EMA9 < EMA21 < EMA55
-        if ema_9 > ema_21 > ema_55:  # Perfect bullish alignment
-            ema_score += 10
-            votes['bullish'] += 2  # Stronger vote for perfect alignment
-            supporting.append('Strong bullish EMA alignment (9 > 21 > 55)')
-        elif ema_9 < ema_21 < ema_55:  # Perfect bearish alignment
-            ema_score += 10
-            votes['bearish'] += 2  # Stronger vote for perfect alignment
-            supporting.append('Strong bearish EMA alignment (9 < 21 < 55)')
-        elif ema_9 > ema_21:  # Partial bullish (short-term)
-            ema_score += 5
-            votes['bullish'] += 1
-            supporting.append('Short-term bullish (EMA9 > EMA21)')
-        elif ema_9 < ema_21:  # Partial bearish (short-term)
-            ema_score += 5
-            votes['bearish'] += 1
-            supporting.append('Short-term bearish (EMA9 < EMA21)')
+    ema_score: int = 0
+    if ema_9 is not None and ema_21 is not None and ema_55 is not None and price is not None:
+        # EMA alignment score (0-10 points), looked up from how EMA9 compares to
+        # EMA21 and EMA21 to EMA55
+        points, bullish_votes, bearish_votes, note = _EMA_ALIGNMENT[
+            3 * _compare(ema_9, ema_21) + _compare(ema_21, ema_55) + 4]
+        ema_score += points
+        votes[BULLISH] += bullish_votes
+        votes[BEARISH] += bearish_votes
+        if note is not None:
+            add_note(note)
 
         # Check for recent crossovers (0-5 points)
         # This would be more accurate with historical data, but we can approximate
@@ -380,442 +627,622 @@ def calculate_confidence_score(
         if ema_9_21_diff_pct < 0.5:  # EMAs are very close, potential crossover
             ema_score += 5
             if ema_9 > ema_21:
-                supporting.append('Recent/potential bullish EMA9/21 crossover')
-                votes['bullish'] += 1
+                add_note((BULLISH, 'Recent/potential bullish EMA9/21 crossover'))
+                votes[BULLISH] += 1
             else:
-                supporting.append('Recent/potential bearish EMA9/21 crossover')
-                votes['bearish'] += 1
+                add_note((BEARISH, 'Recent/potential bearish EMA9/21 crossover'))
+                votes[BEARISH] += 1
 
-        # Price position relative to EMAs (0-5 points)
-        if price > ema_55:  # Price above long-term EMA
-            ema_score += 5
-            votes['bullish'] += 1
-            supporting.append('Price above EMA55 (bullish)')
-        elif price < ema_55:  # Price below long-term EMA
-            ema_score += 5
-            votes['bearish'] += 1
-            supporting.append('Price below EMA55 (bearish)')
+        # Price position relative to the long-term EMA (0-5 points)
+        points, bullish_votes, bearish_votes, note = _PRICE_VS_EMA55[_compare(price, ema_55) + 1]
+        ema_score += points
+        votes[BULLISH] += bullish_votes
+        votes[BEARISH] += bearish_votes
+        if note is not None:
+            add_note(note)
 
         # Check price position relative to all EMAs for stronger signals
         if price > ema_9 and price > ema_21 and price > ema_55:
-            supporting.append('Price above all EMAs (strongly bullish)')
-            votes['bullish'] += 1
+            add_note((BULLISH, 'Price above all EMAs (strongly bullish)'))
+            votes[BULLISH] += 1
         elif price < ema_9 and price < ema_21 and price < ema_55:
-            supporting.append('Price below all EMAs (strongly bearish)')
-            votes['bearish'] += 1
+            add_note((BEARISH, 'Price below all EMAs (strongly bearish)'))
+            votes[BEARISH] += 1
 
-        scores['ema'] = min(20, ema_score)  # Cap at 20 points
+        scores.ema = min(20, ema_score)  # Cap at 20 points
     else:
-        scores['ema'] = 0
+        scores.ema = 0
 
     # 7. Data Quality Score (0-10 points)
-    # Count how many indicators are available vs. expected
-    expected_indicators = [
-        'rsi', 'macd', 'macd_signal', 'macd_hist',
-        'bb_upper', 'bb_middle', 'bb_lower', 'sma_50',
-        'adx', 'adx_plus_di', 'adx_minus_di',
-        'ema_9', 'ema_21', 'ema_55'
-    ]
-    available = sum(1 for k in expected_indicators if tech_indicators.get(k) is not None)
-    expected = len(expected_indicators)
-    data_quality = min(10, (available / expected) * 10) if expected > 0 else 0
-    scores['data_quality'] = data_quality
+    scores.data_quality = _DATA_QUALITY_SCORES[available]
+
+    return _score_context(scores, votes, supporting, conflicting,
+                          market_context, twitter_sentiment, build_notes)
+
+def _ignore_note(note: Note) -> None:
+    """Note callback for _score_market_context when the notes are not needed."""
+    pass
+
+def _score_market_context(
+    direction: str,
+    market_context: Dict[str, Any],
+    add_supporting: Callable[[Note], None],
+    add_conflicting: Callable[[Note], None]
+) -> Tuple[Optional[int], int]:
+    """
+    Scores the market context against the signal direction.
+
+    Depends only on the direction and the market context, so a batch sharing one
+    market context scores it once per direction. Notes are passed to
+    add_supporting/add_conflicting.
+
+    Returns:
+        (market context score (0-30) or None if the context could not be processed,
+        confidence adjustment)
+    """
+    # Calculate a comprehensive market context score (0-30 points)
+    market_score: int = 0
+    context_adjustment: int = 0
+    # Notes that embed a value are stored as (template, args) and formatted in _format_notes
+
+    try:
+        # Extract all market context components
+        fear_greed = market_context.get('fear_greed')
+        fear_greed_trend = market_context.get('fear_greed_trend')
+        global_market = market_context.get('global_market')
+        market_volatility = market_context.get('market_volatility')
+        btc_dominance_data = market_context.get('btc_dominance')
+
+        # --- Fear & Greed Index Analysis (0-10 points) ---
+        if fear_greed and fear_greed.get('value'):
+            fg_value = int(fear_greed.get('value'))
+            fg_class = fear_greed.get('value_classification', 'N/A')
+
+            # More granular scoring based on F&G value
+            if direction == NEUTRAL:
+                # For neutral direction, extreme sentiment in either direction is valuable information
+                market_score += 5 if fg_value > 70 or fg_value < 30 else 3
+            else:
+                fg_bucket = ('extreme_greed' if fg_value > 75 else 'greed' if fg_value > 60 else
+                             'extreme_fear' if fg_value < 25 else 'fear' if fg_value < 40 else 'neutral')
+                points, adjustment, note, supports = _FEAR_GREED_SCORES[direction, fg_bucket]
+                market_score += points
+                context_adjustment += adjustment
+                if note is not None:
+                    (add_supporting if supports else add_conflicting)((note, (fg_value,)))
+
+        # --- Fear & Greed Trend Analysis (0-5 points) ---
+        if fear_greed_trend:
+            trend = fear_greed_trend.get('trend')
+            trend_direction = fear_greed_trend.get('trend_direction')
+
+            # Fear confirms a bullish call (contrarian) and greed a bearish one; the
+            # opposite pairing conflicts. See _FEAR_GREED_TREND_SCORES for the points.
+            if direction != NEUTRAL and (trend in _FEAR_TRENDS or trend in _GREED_TRENDS):
+                supports = (trend in _FEAR_TRENDS) == (direction == BULLISH)
+                # Only fading fear counts as a strong conflict for a bearish call
+                strong_trends = _FALLING_TRENDS if direction == BEARISH and not supports else _RISING_TRENDS
+                points, adjustment = _FEAR_GREED_TREND_SCORES[supports, trend_direction in strong_trends]
+                market_score += points
+                context_adjustment += adjustment
+
+        # --- Market Trend Analysis (0-10 points) ---
+        if global_market and global_market.get('market_cap_change_percentage_24h_usd') is not None:
+            mkt_cap_change = global_market.get('market_cap_change_percentage_24h_usd')
+
+            # More granular scoring based on market movement magnitude; a NaN change
+            # compares false everywhere and lands in the flat bucket
+            mkt_bucket = 2 - (mkt_cap_change < -2.0) - (mkt_cap_change < -5.0) + (mkt_cap_change > 2.0) + (mkt_cap_change > 5.0)
+            points, adjustment, note, supports = _MARKET_CAP_SCORES[direction, mkt_bucket]
+            market_score += points
+            context_adjustment += adjustment
+            if note is not None:
+                (add_supporting if supports else add_conflicting)((note, (mkt_cap_change,)))
+
+        # --- Market Volatility Analysis (0-5 points) ---
+        if market_volatility:
+            volatility_pattern = market_volatility.get('volatility_pattern')
+            avg_volatility_24h = market_volatility.get('avg_volatility_24h')
+
+            if volatility_pattern and avg_volatility_24h is not None:
+                # Score based on volatility pattern and alignment with predicted direction
+                if volatility_pattern == 'highly_volatile':
+                    # High volatility increases confidence in strong directional moves
+                    if direction in (BULLISH, BEARISH):
+                        market_score += 5
+                        context_adjustment += 3
+                    else:
+                        # For neutral direction, high volatility suggests caution
+                        market_score += 2
+                elif volatility_pattern == 'stable':
+                    # Low volatility suggests less confidence in strong moves
+                    if direction in (BULLISH, BEARISH):
+                        market_score += 2
+                    else:
+                        # For neutral direction, low volatility confirms sideways movement
+                        market_score += 4
+                        context_adjustment += 2
+
+        # --- BTC Dominance Analysis (0-5 points) ---
+        if btc_dominance_data:
+            market_implication = btc_dominance_data.get('market_implication')
+
+            # Score based on dominance implications for the asset
+            # This is a simplified approach - ideally we'd consider if the asset is BTC, ETH, or an altcoin
+            if market_implication == 'altcoin_bullish' and direction == BULLISH:
+                market_score += 5
+                context_adjustment += 3
+                add_supporting("Context: Low BTC dominance supports bullish altcoin signal")
+            elif market_implication == 'altcoin_bearish' and direction == BEARISH:
+                market_score += 5
+                context_adjustment += 3
+                add_supporting("Context: High BTC dominance supports bearish altcoin signal")
+            elif market_implication == 'altcoin_bullish' and direction == BEARISH:
+                market_score += 1
+                context_adjustment -= 2
+                add_conflicting("Context: Low BTC dominance conflicts with bearish altcoin signal")
+            elif market_implication == 'altcoin_bearish' and direction == BULLISH:
+                market_score += 1
+                context_adjustment -= 2
+                add_conflicting("Context: High BTC dominance conflicts with bullish altcoin signal")
+            else:
+                market_score += 3
+
+        # Cap the market score at 30 points (increased from 20)
+        market_score = min(30, market_score)
+        return market_score, context_adjustment
+    except Exception:
+        logger.exception("Error processing market context")
+        # Continue without a market context score; the adjustment made so far is kept
+        return None, context_adjustment
+
+def _score_twitter_sentiment(
+    direction: str,
+    twitter_sentiment: Dict[str, Any]
+) -> Tuple[Optional[int], int, Optional[str], bool]:
+    """
+    Scores Twitter sentiment against the signal direction.
+
+    Returns:
+        (Twitter sentiment score (0-20) or None if the sentiment could not be processed,
+        confidence adjustment, note or None, whether the note supports the signal)
+    """
+    # Calculate a separate Twitter sentiment score (0-20 points)
+    twitter_score: int = 0
+    twitter_adjustment: int = 0
+    note: Optional[str] = None
+    supports = False
+    try:
+        overall_sentiment = twitter_sentiment.get('overall_sentiment', NEUTRAL)
+        key_tweets = twitter_sentiment.get('key_tweets', [])
+
+        # Base score on sentiment alignment with technical direction
+        entry = _TWITTER_SCORES.get((direction, overall_sentiment))
+        if entry is None:
+            if direction == NEUTRAL and overall_sentiment is None:
+                # A neutral signal only scores a clear sentiment; without one there is no Twitter score
+                return None, twitter_adjustment, note, supports
+            entry = _TWITTER_SCORES[direction, _OTHER_SENTIMENT]
+        points, adjustment, note, supports = entry
+        twitter_score += points
+        twitter_adjustment += adjustment
+
+        # Add points for the presence of key tweets (indicates stronger signal)
+        if len(key_tweets) >= 3:
+            twitter_score += 5
+
+        # Cap the Twitter score at 20 points
+        return min(20, twitter_score), twitter_adjustment, note, supports
+    except Exception:
+        logger.exception("Error processing Twitter sentiment")
+        # Continue without a Twitter sentiment score; the adjustment made so far is kept
+        return None, twitter_adjustment, note, supports
+
+def _score_context(
+    scores: FactorScores,
+    votes: Dict[str, int],
+    supporting: List[Tuple[str, str]],
+    conflicting: List[str],
+    market_context: Optional[Dict[str, Any]],
+    twitter_sentiment: Optional[Dict[str, Any]],
+    build_notes: bool
+) -> Tuple[FactorScores, str, float, int, int, List[Note], List[Note]]:
+    """
+    Second half of _score_factors, once the technical indicators have been scored.
+
+    Works out the direction and indicator agreement from the votes, sorts the
+    technical notes into supporting/conflicting, and scores market context and
+    Twitter sentiment into `scores`. Returns the same tuple as _score_factors.
+    """
+    final_supporting: List[Note] = []
+    final_conflicting: List[Note] = []
+    add_supporting = final_supporting.append
+    add_conflicting = final_conflicting.append
 
     # Calculate overall direction based on votes
-    if votes['bullish'] > votes['bearish']:
-        direction = 'bullish'
-    elif votes['bearish'] > votes['bullish']:
-        direction = 'bearish'
+    if votes[BULLISH] > votes[BEARISH]:
+        direction = BULLISH
+    elif votes[BEARISH] > votes[BULLISH]:
+        direction = BEARISH
     else:
-        direction = 'neutral'
+        direction = NEUTRAL
 
     # Refine supporting/conflicting lists based on final direction
-    final_supporting = []
-    final_conflicting = []
-    for item in supporting:
-        is_supporting = (direction == 'bullish' and 'bullish' in item or 'oversold' in item or '> SMA' in item or 'lower Bollinger' in item) or \
-                        (direction == 'bearish' and 'bearish' in item or 'overbought' in item or '< SMA' in item or 'upper Bollinger' in item)
-        if is_supporting or direction == 'neutral':
-            final_supporting.append(item)
-        else:
-            final_conflicting.append(item)
-    # Add any existing conflicts (like MACD divergence)
-    final_conflicting.extend(conflicting)
+    if build_notes:
+        for tag, item in supporting:
+            if tag == direction or direction == NEUTRAL:
+                add_supporting(item)
+            else:
+                add_conflicting(item)
+        # Add any existing conflicts (like MACD divergence)
+        final_conflicting.extend(conflicting)
 
 
     # Calculate agreement score - how many indicators agree vs disagree with the final direction
-    agreeing_votes = votes[direction] if direction != 'neutral' else 0
-    disagreeing_votes = votes['bearish'] if direction == 'bullish' else votes['bullish'] if direction == 'bearish' else 0
+    agreeing_votes = votes[direction] if direction != NEUTRAL else 0
+    disagreeing_votes = votes[BEARISH] if direction == BULLISH else votes[BULLISH] if direction == BEARISH else 0
     total_directional_votes = agreeing_votes + disagreeing_votes
 
     if total_directional_votes > 0:
         agreement_ratio = agreeing_votes / total_directional_votes
+        agreement_percent = _agreement_percent(agreeing_votes, total_directional_votes)
     else: # If only neutral votes or no votes
         agreement_ratio = 0.5 # Default to neutral agreement
+        agreement_percent = 50
 
-    agreement_score = agreement_ratio * 10 # Max 10 points for agreement
-
-    # Final score calculation (weighted sum of components + agreement)
-    # Weights adjusted to increase market context importance
-    overall_score = (
-        scores.get('rsi', 0) * 0.08 +          # RSI contribution (8%) - Reduced from 10%
-        scores.get('macd', 0) * 0.08 +         # MACD contribution (8%) - Reduced from 10%
-        scores.get('bb', 0) * 0.08 +           # Bollinger Bands contribution (8%) - Reduced from 10%
-        scores.get('sma', 0) * 0.08 +          # SMA contribution (8%) - Reduced from 10%
-        scores.get('adx', 0) * 0.08 +          # ADX contribution (8%) - Reduced from 10%
-        scores.get('ema', 0) * 0.08 +          # EMA contribution (8%) - Reduced from 10%
-        scores.get('market_context', 0) * 0.25 + # Market context contribution (25%) - Increased from 15%
-        scores.get('twitter_sentiment', 0) * 0.15 + # Twitter sentiment contribution (15%)
-        scores.get('data_quality', 0) * 0.10 + # Data quality contribution (10%)
-        agreement_score * 1.0                  # Agreement contribution (added on top)
-    )
+    # Without market context or Twitter sentiment there is nothing more to score
+    if not market_context and not twitter_sentiment:
+        return (scores, direction, agreement_ratio, agreement_percent, 0, final_supporting, final_conflicting)
 
     # --- Enhanced Market Context Analysis ---
-    # Calculate a comprehensive market context score (0-30 points)
-    market_score = 0
-    context_notes = []
-    context_adjustment = 0
-
+    # Context notes go straight into the final supporting/conflicting lists
+    context_adjustment: int = 0
     if market_context:
-        try:
-            # Extract all market context components
-            fear_greed = market_context.get('fear_greed')
-            fear_greed_trend = market_context.get('fear_greed_trend')
-            global_market = market_context.get('global_market')
-            market_volatility = market_context.get('market_volatility')
-            btc_dominance_data = market_context.get('btc_dominance')
-
-            # --- Fear & Greed Index Analysis (0-10 points) ---
-            if fear_greed and fear_greed.get('value'):
-                fg_value = int(fear_greed.get('value'))
-                fg_class = fear_greed.get('value_classification', 'N/A')
-
-                # More granular scoring based on F&G value
-                if direction == 'bullish':
-                    if fg_value > 75: # Extreme Greed vs Bullish signal
-                        market_score += 0  # No points (conflict)
-                        context_adjustment -= 10
-                        context_notes.append(f"Extreme Greed ({fg_value}) conflicts with bullish signal")
-                    elif fg_value > 60: # Greed vs Bullish signal
-                        market_score += 2
-                        context_adjustment -= 5
-                        context_notes.append(f"Greed ({fg_value}) slightly conflicts with bullish signal")
-                    elif fg_value < 25: # Extreme Fear vs Bullish signal (Contrarian)
-                        market_score += 10  # Maximum points
-                        context_adjustment += 10
-                        context_notes.append(f"Extreme Fear ({fg_value}) strongly supports bullish signal (contrarian)")
-                    elif fg_value < 40: # Fear vs Bullish signal (Contrarian)
-                        market_score += 7
-                        context_adjustment += 5
-                        context_notes.append(f"Fear ({fg_value}) supports bullish signal (contrarian)")
-                    else: # Neutral F&G
-                        market_score += 5
-                        context_notes.append(f"Neutral market sentiment ({fg_value})")
-
-                elif direction == 'bearish':
-                    if fg_value > 75: # Extreme Greed vs Bearish signal
-                        market_score += 10  # Maximum points
-                        context_adjustment += 10
-                        context_notes.append(f"Extreme Greed ({fg_value}) strongly supports bearish signal")
-                    elif fg_value > 60: # Greed vs Bearish signal
-                        market_score += 7
-                        context_adjustment += 5
-                        context_notes.append(f"Greed ({fg_value}) supports bearish signal")
-                    elif fg_value < 25: # Extreme Fear vs Bearish signal (Contrarian)
-                        market_score += 0  # No points (conflict)
-                        context_adjustment -= 10
-                        context_notes.append(f"Extreme Fear ({fg_value}) conflicts with bearish signal (contrarian)")
-                    elif fg_value < 40: # Fear vs Bearish signal (Contrarian)
-                        market_score += 2
-                        context_adjustment -= 5
-                        context_notes.append(f"Fear ({fg_value}) slightly conflicts with bearish signal (contrarian)")
-                    else: # Neutral F&G
-                        market_score += 5
-                        context_notes.append(f"Neutral market sentiment ({fg_value})")
-                else: # Neutral direction
-                    # For neutral direction, extreme sentiment in either direction is valuable information
-                    if fg_value > 70 or fg_value < 30:
-                        market_score += 5
-                        context_notes.append(f"Extreme market sentiment ({fg_value}) with neutral technical signals")
-                    else:
-                        market_score += 3
-                        context_notes.append(f"Neutral market sentiment ({fg_value}) aligns with neutral technical signals")
-
-            # --- Fear & Greed Trend Analysis (0-5 points) ---
-            if fear_greed_trend:
-                trend = fear_greed_trend.get('trend')
-                trend_direction = fear_greed_trend.get('trend_direction')
-                avg_value = fear_greed_trend.get('avg_value')
-
-                # Add trend information to context notes
-                context_notes.append(f"F&G trend: {trend} ({avg_value}, {trend_direction})")
-
-                # Score based on trend direction and alignment with predicted direction
-                if direction == 'bullish':
-                    if trend == 'extreme_fear' or trend == 'fear':
-                        # Contrarian bullish signal
-                        if trend_direction in ['increasing', 'strongly_increasing']:
-                            # Fear increasing = potential bottoming (very bullish contrarian)
-                            market_score += 5
-                            context_adjustment += 5
-                            context_notes.append("Fear increasing - potential bottoming pattern (bullish)")
-                        else:
-                            # Fear stable/decreasing = still contrarian bullish
-                            market_score += 3
-                            context_adjustment += 3
-                            context_notes.append("Fear stable/decreasing - contrarian bullish signal")
-                    elif trend == 'extreme_greed' or trend == 'greed':
-                        # Conflicting with bullish signal
-                        if trend_direction in ['increasing', 'strongly_increasing']:
-                            # Greed increasing = potential topping (bearish)
-                            market_score += 0
-                            context_adjustment -= 5
-                            context_notes.append("Greed increasing - potential topping pattern (bearish)")
-                        else:
-                            # Greed stable/decreasing = less bearish
-                            market_score += 1
-                            context_adjustment -= 2
-                            context_notes.append("Greed stable/decreasing - slightly bearish signal")
-                elif direction == 'bearish':
-                    if trend == 'extreme_greed' or trend == 'greed':
-                        # Confirming bearish signal
-                        if trend_direction in ['increasing', 'strongly_increasing']:
-                            # Greed increasing = potential topping (very bearish)
-                            market_score += 5
-                            context_adjustment += 5
-                            context_notes.append("Greed increasing - potential topping pattern (bearish)")
-                        else:
-                            # Greed stable/decreasing = still bearish
-                            market_score += 3
-                            context_adjustment += 3
-                            context_notes.append("Greed stable/decreasing - bearish signal")
-                    elif trend == 'extreme_fear' or trend == 'fear':
-                        # Conflicting with bearish signal
-                        if trend_direction in ['decreasing', 'strongly_decreasing']:
-                            # Fear decreasing = potential bottoming (bullish)
-                            market_score += 0
-                            context_adjustment -= 5
-                            context_notes.append("Fear decreasing - potential bottoming pattern (bullish)")
-                        else:
-                            # Fear stable/increasing = less bullish
-                            market_score += 1
-                            context_adjustment -= 2
-                            context_notes.append("Fear stable/increasing - slightly bullish signal")
-
-            # --- Market Trend Analysis (0-10 points) ---
-            if global_market and global_market.get('market_cap_change_percentage_24h_usd') is not None:
-                mkt_cap_change = global_market.get('market_cap_change_percentage_24h_usd')
-
-                # More granular scoring based on market movement magnitude
-                if direction == 'bullish':
-                    if mkt_cap_change < -5.0: # Strong market down vs Bullish signal
-                        market_score += 0  # No points (strong conflict)
-                        context_adjustment -= 10
-                        context_notes.append(f"Strong market down ({mkt_cap_change:.2f}%) conflicts with bullish signal")
-                    elif mkt_cap_change < -2.0: # Moderate market down vs Bullish signal
-                        market_score += 2
-                        context_adjustment -= 5
-                        context_notes.append(f"Market down ({mkt_cap_change:.2f}%) conflicts with bullish signal")
-                    elif mkt_cap_change > 5.0: # Strong market up vs Bullish signal
-                        market_score += 10  # Maximum points
-                        context_adjustment += 10
-                        context_notes.append(f"Strong market up ({mkt_cap_change:.2f}%) strongly supports bullish signal")
-                    elif mkt_cap_change > 2.0: # Moderate market up vs Bullish signal
-                        market_score += 7
-                        context_adjustment += 5
-                        context_notes.append(f"Market up ({mkt_cap_change:.2f}%) supports bullish signal")
-                    else: # Neutral market
-                        market_score += 5
-                        context_notes.append(f"Stable market ({mkt_cap_change:.2f}%)")
-
-                elif direction == 'bearish':
-                    if mkt_cap_change < -5.0: # Strong market down vs Bearish signal
-                        market_score += 10  # Maximum points
-                        context_adjustment += 10
-                        context_notes.append(f"Strong market down ({mkt_cap_change:.2f}%) strongly supports bearish signal")
-                    elif mkt_cap_change < -2.0: # Moderate market down vs Bearish signal
-                        market_score += 7
-                        context_adjustment += 5
-                        context_notes.append(f"Market down ({mkt_cap_change:.2f}%) supports bearish signal")
-                    elif mkt_cap_change > 5.0: # Strong market up vs Bearish signal
-                        market_score += 0  # No points (strong conflict)
-                        context_adjustment -= 10
-                        context_notes.append(f"Strong market up ({mkt_cap_change:.2f}%) conflicts with bearish signal")
-                    elif mkt_cap_change > 2.0: # Moderate market up vs Bearish signal
-                        market_score += 2
-                        context_adjustment -= 5
-                        context_notes.append(f"Market up ({mkt_cap_change:.2f}%) conflicts with bearish signal")
-                    else: # Neutral market
-                        market_score += 5
-                        context_notes.append(f"Stable market ({mkt_cap_change:.2f}%)")
-                else: # Neutral direction
-                    # For neutral direction, extreme market moves are valuable information
-                    if abs(mkt_cap_change) > 5.0:
-                        market_score += 5
-                        context_notes.append(f"Strong market movement ({mkt_cap_change:.2f}%) with neutral technical signals")
-                    else:
-                        market_score += 3
-                        context_notes.append(f"Stable market ({mkt_cap_change:.2f}%) aligns with neutral technical signals")
-
-            # --- Market Volatility Analysis (0-5 points) ---
-            if market_volatility:
-                volatility_pattern = market_volatility.get('volatility_pattern')
-                avg_volatility_24h = market_volatility.get('avg_volatility_24h')
-
-                # Add volatility information to context notes
-                if volatility_pattern and avg_volatility_24h is not None:
-                    context_notes.append(f"Market volatility: {volatility_pattern} ({avg_volatility_24h:.2f}% 24h)")
-
-                    # Score based on volatility pattern and alignment with predicted direction
-                    if volatility_pattern == 'highly_volatile':
-                        # High volatility increases confidence in strong directional moves
-                        if direction in ['bullish', 'bearish']:
-                            market_score += 5
-                            context_adjustment += 3
-                            context_notes.append(f"High volatility strengthens {direction} signal")
-                        else:
-                            # For neutral direction, high volatility suggests caution
-                            market_score += 2
-                            context_notes.append("High volatility with neutral signals suggests caution")
-                    elif volatility_pattern == 'stable':
-                        # Low volatility suggests less confidence in strong moves
-                        if direction in ['bullish', 'bearish']:
-                            market_score += 2
-                            context_notes.append(f"Low volatility may weaken {direction} signal strength")
-                        else:
-                            # For neutral direction, low volatility confirms sideways movement
-                            market_score += 4
-                            context_adjustment += 2
-                            context_notes.append("Low volatility confirms neutral/sideways bias")
-
-            # --- BTC Dominance Analysis (0-5 points) ---
-            if btc_dominance_data:
-                btc_dominance = btc_dominance_data.get('btc_dominance')
-                dominance_level = btc_dominance_data.get('dominance_level')
-                market_implication = btc_dominance_data.get('market_implication')
-                btc_eth_ratio = btc_dominance_data.get('btc_eth_ratio')
-                ratio_interpretation = btc_dominance_data.get('ratio_interpretation')
-
-                # Add BTC dominance information to context notes
-                context_notes.append(f"BTC dominance: {dominance_level} ({btc_dominance:.2f}%, {market_implication})")
-                context_notes.append(f"BTC/ETH ratio: {btc_eth_ratio:.2f} ({ratio_interpretation})")
-
-                # Score based on dominance implications for the asset
-                # This is a simplified approach - ideally we'd consider if the asset is BTC, ETH, or an altcoin
-                if market_implication == 'altcoin_bullish' and direction == 'bullish':
-                    market_score += 5
-                    context_adjustment += 3
-                    context_notes.append("Low BTC dominance supports bullish altcoin signal")
-                elif market_implication == 'altcoin_bearish' and direction == 'bearish':
-                    market_score += 5
-                    context_adjustment += 3
-                    context_notes.append("High BTC dominance supports bearish altcoin signal")
-                elif market_implication == 'altcoin_bullish' and direction == 'bearish':
-                    market_score += 1
-                    context_adjustment -= 2
-                    context_notes.append("Low BTC dominance conflicts with bearish altcoin signal")
-                elif market_implication == 'altcoin_bearish' and direction == 'bullish':
-                    market_score += 1
-                    context_adjustment -= 2
-                    context_notes.append("High BTC dominance conflicts with bullish altcoin signal")
-                else:
-                    market_score += 3
-                    context_notes.append(f"Neutral BTC dominance impact on {direction} signal")
-
-            # Cap the market score at 30 points (increased from 20)
-            market_score = min(30, market_score)
+        market_score, context_adjustment = _score_market_context(
+            direction, market_context, add_supporting, add_conflicting)
+        if market_score is not None:
             # Store the market score for inclusion in the weighted calculation
-            scores['market_context'] = market_score
-        except Exception as e:
-            print(f"Error processing market context: {e}")
-            # Continue without market context adjustment
+            scores.market_context = market_score
 
     # --- Twitter Sentiment Analysis ---
-    # Calculate a separate Twitter sentiment score (0-20 points)
-    twitter_score = 0
-    twitter_notes = []
-    twitter_adjustment = 0
-
+    twitter_adjustment: int = 0
     if twitter_sentiment:
-        try:
-            overall_sentiment = twitter_sentiment.get('overall_sentiment', 'neutral')
-            summary = twitter_sentiment.get('summary', '')
-            key_tweets = twitter_sentiment.get('key_tweets', [])
-
-            # Base score on sentiment alignment with technical direction
-            if direction == 'bullish':
-                if overall_sentiment == 'bullish':
-                    twitter_score += 15  # Strong alignment
-                    twitter_adjustment += 10
-                    twitter_notes.append(f"Bullish Twitter sentiment strongly supports bullish technical signals")
-                elif overall_sentiment == 'bearish':
-                    twitter_score += 0   # Conflict
-                    twitter_adjustment -= 10
-                    twitter_notes.append(f"Bearish Twitter sentiment conflicts with bullish technical signals")
-                else:  # neutral
-                    twitter_score += 5   # Neutral
-                    twitter_notes.append(f"Neutral Twitter sentiment with bullish technical signals")
-            elif direction == 'bearish':
-                if overall_sentiment == 'bearish':
-                    twitter_score += 15  # Strong alignment
-                    twitter_adjustment += 10
-                    twitter_notes.append(f"Bearish Twitter sentiment strongly supports bearish technical signals")
-                elif overall_sentiment == 'bullish':
-                    twitter_score += 0   # Conflict
-                    twitter_adjustment -= 10
-                    twitter_notes.append(f"Bullish Twitter sentiment conflicts with bearish technical signals")
-                else:  # neutral
-                    twitter_score += 5   # Neutral
-                    twitter_notes.append(f"Neutral Twitter sentiment with bearish technical signals")
-            else:  # neutral direction
-                if overall_sentiment != 'neutral':
-                    twitter_score += 10  # Any clear sentiment is valuable with neutral technicals
-                    twitter_notes.append(f"{overall_sentiment.capitalize()} Twitter sentiment with neutral technical signals")
-                else:
-                    twitter_score += 5   # Both neutral
-                    twitter_notes.append(f"Neutral Twitter sentiment aligns with neutral technical signals")
-
-            # Add points for the presence of key tweets (indicates stronger signal)
-            if len(key_tweets) >= 3:
-                twitter_score += 5
-                twitter_notes.append(f"Multiple key tweets/themes identified ({len(key_tweets)})")
-
-            # Cap the Twitter score at 20 points
-            twitter_score = min(20, twitter_score)
+        twitter_score, twitter_adjustment, note, supports = _score_twitter_sentiment(direction, twitter_sentiment)
+        if build_notes and note is not None:
+            (add_supporting if supports else add_conflicting)(f"Twitter: {note}")
+        if twitter_score is not None:
             # Store the Twitter score for inclusion in the weighted calculation
-            scores['twitter_sentiment'] = twitter_score
-        except Exception as e:
-            print(f"Error processing Twitter sentiment: {e}")
-            # Continue without Twitter sentiment adjustment
-
-    # Apply context and Twitter adjustments and clamp score
-    overall_score += context_adjustment + twitter_adjustment
-    overall_score = max(0, min(100, round(overall_score)))
-
-    # Add context notes to supporting/conflicting lists
-    for note in context_notes:
-        if "supports" in note:
-            final_supporting.append(f"Context: {note}")
-        elif "conflicts" in note:
-            final_conflicting.append(f"Context: {note}")
-
-    # Add Twitter notes to supporting/conflicting lists
-    for note in twitter_notes:
-        if "supports" in note or "aligns" in note:
-            final_supporting.append(f"Twitter: {note}")
-        elif "conflicts" in note:
-            final_conflicting.append(f"Twitter: {note}")
+            scores.twitter_sentiment = twitter_score
 
-    # Generate trading signal based on confidence score and direction
-    signal = generate_trading_signal(overall_score, direction, price, tech_indicators)
+    return (scores, direction, agreement_ratio, agreement_percent,
+            context_adjustment + twitter_adjustment, final_supporting, final_conflicting)
+
+def _format_notes(notes: List[Note]) -> List[str]:
+    """
+    Formats deferred (template, args) notes, keeping their order.
+
+    No de-duplication pass is needed: every scoring rule adds at most one note and
+    no two rules share a note, so the lists are unique as they are built.
+    """
+    return [note if isinstance(note, str) else note[0] % note[1] for note in notes]
 
-    # Return structured confidence data
+def _insufficient_data_result() -> ConfidenceResult:
+    """
+    Confidence data for an asset with too few indicators to score.
+    """
+    return {
+        'overall_score': 0,
+        'direction': NEUTRAL,
+        'signal': _HOLD,
+        'factor_scores': {},
+        'supporting_indicators': [],
+        'conflicting_indicators': [],
+        'indicator_agreement': 0.5
+    }
+
+def _confidence_result(overall_score: int, direction: str, signal: TradingSignal,
+                       scores: FactorScores, final_supporting: List[Note],
+                       final_conflicting: List[Note], agreement_percent: int,
+                       verbose: bool = True) -> ConfidenceResult:
+    """
+    Builds the structured confidence data returned by the confidence scorers.
+    Notes are only formatted when verbose is set; otherwise both lists are empty.
+    """
     return {
         'overall_score': overall_score,
         'direction': direction,
         'signal': signal,  # Add the trading signal
-        'factor_scores': scores, # For potential debugging/fine-tuning
-        'supporting_indicators': list(set(final_supporting)) if 'final_supporting' in locals() else [], # Use set to remove duplicates
-        'conflicting_indicators': list(set(final_conflicting)) if 'final_conflicting' in locals() else [],
-        'indicator_agreement': round(agreement_ratio, 2) if 'agreement_ratio' in locals() else 0.5
+        'factor_scores': scores.to_dict(), # For potential debugging/fine-tuning
+        'supporting_indicators': _format_notes(final_supporting) if verbose else [],
+        'conflicting_indicators': _format_notes(final_conflicting) if verbose else [],
+        'indicator_agreement': agreement_percent / 100
     }
+
+def calculate_confidence_score(
+    tech_indicators: Dict[str, Optional[float]],
+    price: Optional[float], # Allow price to be None
+    market_context: Optional[Dict[str, Any]] = None, # Add market context parameter
+    twitter_sentiment: Optional[Dict[str, Any]] = None, # Add Twitter sentiment parameter
+    verbose: bool = True,
+    *,
+    # Bound at definition time so the body reads them as fast locals; not part of the API
+    _score=_score_factors,
+    _core=_confidence_core,
+    _weights=_FACTOR_WEIGHT_VALUES,
+    _gen=generate_trading_signal,
+    _result=_confidence_result
+) -> ConfidenceResult:
+    """
+    Calculate a confidence score (0-100) for predictions based on technical indicators,
+    broader market context, and Twitter sentiment analysis.
+
+    Args:
+        tech_indicators: Dictionary of technical indicator values.
+        price: Current price of the asset. Can be None if unavailable.
+        market_context: Optional dictionary containing 'global_market' and 'fear_greed' data.
+        twitter_sentiment: Optional dictionary containing Twitter sentiment data from Perplexity.
+        verbose: Whether to build the supporting/conflicting indicator notes. Callers that
+            only need the score, direction and signal can pass False to skip formatting them.
+
+    Returns:
+        Dictionary containing:
+        - overall_score: 0-100 confidence score.
+        - direction: 'bullish', 'bearish', or 'neutral'.
+        - factor_scores: Dictionary of individual factor confidence scores.
+        - supporting_indicators: List of indicators supporting the predicted direction.
+        - conflicting_indicators: List of indicators against the predicted direction.
+        - indicator_agreement: Ratio of agreeing indicators to total directional indicators.
+    """
+    factors = _score(tech_indicators, price, market_context, twitter_sentiment, verbose)
+    if factors is None:
+        return _insufficient_data_result()
+    (scores, direction, agreement_ratio, agreement_percent,
+     adjustment, final_supporting, final_conflicting) = factors
+
+    # Final score calculation (weighted sum of components + agreement),
+    # with the context and Twitter adjustments applied and the score clamped
+    factor_scores = scores.weighted_factors() + (agreement_ratio * 10,)
+    overall_score = _core(factor_scores, _weights, float(adjustment))
+
+    # Generate trading signal based on confidence score and direction
+    signal = _gen(overall_score, direction, price, tech_indicators)
+
+    return _result(overall_score, direction, signal, scores,
+                   final_supporting, final_conflicting, agreement_percent, verbose)
+
+def _indicator_columns(tech_indicators_list: List[Dict[str, Optional[float]]]) -> Dict[str, np.ndarray]:
+    """
+    Converts per-asset indicator dictionaries into one float64 column per indicator,
+    with NaN for missing values.
+    """
+    columns = {}
+    for name in _EXPECTED_INDICATORS:
+        values = [tech_indicators.get(name) for tech_indicators in tech_indicators_list]
+        columns[name] = np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+    return columns
+
+def _score_technical_batch(columns: Dict[str, np.ndarray], price: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Scores the technical factors of many assets at once.
+
+    Applies the rules of the technical part of _score_factors to whole columns, with
+    NaN standing for a missing value. Returns the factor scores as an (assets x 7)
+    matrix in FactorScores order, the bullish, bearish and neutral vote counts, and the
+    number of available indicators per asset.
+    """
+    rsi, macd, macd_signal, macd_hist = columns['rsi'], columns['macd'], columns['macd_signal'], columns['macd_hist']
+    bb_upper, bb_middle, bb_lower = columns['bb_upper'], columns['bb_middle'], columns['bb_lower']
+    sma_50 = columns['sma_50']
+    adx, plus_di, minus_di = columns['adx'], columns['adx_plus_di'], columns['adx_minus_di']
+    ema_9, ema_21, ema_55 = columns['ema_9'], columns['ema_21'], columns['ema_55']
+    has_price = ~np.isnan(price)
+
+    bullish = np.zeros(len(price), dtype=np.int64)
+    bearish = np.zeros(len(price), dtype=np.int64)
+    neutral = np.zeros(len(price), dtype=np.int64)
+
+    # Invalid comparisons and divisions only happen in entries masked out below
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # 1. RSI
+        has_rsi = ~np.isnan(rsi)
+        oversold = has_rsi & (rsi < 30)
+        overbought = has_rsi & (rsi > 70)
+        rsi_neutral = has_rsi & ~oversold & ~overbought
+        rsi_score = np.where(oversold, np.minimum(20, (30 - rsi) * 1.5),
+                    np.where(overbought, np.minimum(20, (rsi - 70) * 1.5),
+                    np.where(rsi_neutral, np.maximum(0, 10 - np.abs(50 - rsi) * 0.2), 0.0)))
+        bullish += oversold
+        bearish += overbought
+        neutral += rsi_neutral
+
+        # 2. MACD
+        has_macd = ~(np.isnan(macd) | np.isnan(macd_signal) | np.isnan(macd_hist))
+        macd_score = np.where(has_macd, np.minimum(15, np.abs(macd_hist) * 50)
+                              + np.maximum(0, 10 - np.abs(macd - macd_signal) * 20), 0.0)
+        macd_bullish = has_macd & (macd > macd_signal) & (macd_hist > 0)
+        macd_bearish = has_macd & (macd < macd_signal) & (macd_hist < 0)
+        bullish += macd_bullish
+        bearish += macd_bearish
+        neutral += has_macd & ~macd_bullish & ~macd_bearish
+
+        # 3. Bollinger Bands
+        band_width = bb_upper - bb_lower
+        has_bb = ~(np.isnan(bb_upper) | np.isnan(bb_middle) | np.isnan(bb_lower)) & has_price & (band_width > 1e-6)
+        position = (price - bb_lower) / band_width
+        near_lower = has_bb & (position < 0.1)
+        near_upper = has_bb & (position > 0.9)
+        bb_neutral = has_bb & ~near_lower & ~near_upper
+        bb_score = np.where(near_lower, np.minimum(25, (0.1 - position) * 250),
+                   np.where(near_upper, np.minimum(25, (position - 0.9) * 250),
+                   np.where(bb_neutral, np.maximum(0, 10 - np.abs(0.5 - position) * 20), 0.0)))
+        bullish += near_lower
+        bearish += near_upper
+        neutral += bb_neutral
+
+        # 4. SMA
+        has_sma = ~np.isnan(sma_50) & has_price
+        perc_diff = np.where(sma_50 != 0, np.abs(price - sma_50) / sma_50 * 100, 0.0)
+        sma_score = np.where(has_sma, np.minimum(20, perc_diff * 4), 0.0)
+        bullish += has_sma & (price > sma_50)
+        bearish += has_sma & (price < sma_50)
+        neutral += has_sma & (price == sma_50)
+
+        # 5. ADX
+        has_adx = ~(np.isnan(adx) | np.isnan(plus_di) | np.isnan(minus_di))
+        adx_strength = np.where(adx < 20, adx / 2, np.where(adx < 30, 10 + (adx - 20) / 2, 15.0))
+        di_sum = np.maximum(plus_di + minus_di, 1e-12)
+        di_diff_pct = np.abs(plus_di - minus_di) * 2 / di_sum * 100
+        adx_score = np.where(has_adx, np.minimum(20, adx_strength + np.minimum(5, di_diff_pct / 10)), 0.0)
+        clear_trend = di_diff_pct > 20
+        di_bullish = has_adx & (plus_di > minus_di)
+        di_bearish = has_adx & (minus_di > plus_di)
+        bullish += di_bullish
+        bullish += di_bullish & clear_trend  # Extra vote for strong directional clarity
+        bearish += di_bearish
+        bearish += di_bearish & clear_trend
+        neutral += has_adx & ~di_bullish & ~di_bearish
+
+        # 6. EMA
+        has_ema = ~(np.isnan(ema_9) | np.isnan(ema_21) | np.isnan(ema_55)) & has_price
+        bull_aligned = has_ema & (ema_9 > ema_21) & (ema_21 > ema_55)
+        bear_aligned = has_ema & (ema_9 < ema_21) & (ema_21 < ema_55)
+        short_bullish = has_ema & ~bull_aligned & (ema_9 > ema_21)
+        short_bearish = has_ema & ~bear_aligned & (ema_9 < ema_21)
+        ema_diff_pct = np.where(ema_21 != 0, np.abs(ema_9 - ema_21) / ema_21 * 100, 0.0)
+        crossover = has_ema & (ema_diff_pct < 0.5)
+        above_55 = has_ema & (price > ema_55)
+        below_55 = has_ema & (price < ema_55)
+        ema_score = (10 * (bull_aligned | bear_aligned) + 5 * (short_bullish | short_bearish)
+                     + 5 * crossover + 5 * (above_55 | below_55))
+        ema_score = np.minimum(20, ema_score).astype(np.float64)
+        bullish += 2 * bull_aligned + short_bullish + (crossover & (ema_9 > ema_21)) + above_55
+        bearish += 2 * bear_aligned + short_bearish + (crossover & ~(ema_9 > ema_21)) + below_55
+        bullish += has_ema & (price > ema_9) & (price > ema_21) & (price > ema_55)
+        bearish += has_ema & (price < ema_9) & (price < ema_21) & (price < ema_55)
+
+    # 7. Data quality
+    available = sum((~np.isnan(columns[name])).astype(np.int64) for name in _EXPECTED_INDICATORS)
+    data_quality = np.array(_DATA_QUALITY_SCORES, dtype=np.float64)[available]
+
+    factor_matrix = np.column_stack((rsi_score, macd_score, bb_score, sma_score, adx_score, ema_score, data_quality))
+    return factor_matrix, bullish, bearish, neutral, available
+
+def calculate_confidence_score_batch(
+    tech_indicators_list: List[Dict[str, Optional[float]]],
+    prices: List[Optional[float]],
+    market_context: Optional[Dict[str, Any]] = None,
+    twitter_sentiments: Optional[List[Optional[Dict[str, Any]]]] = None,
+    verbose: bool = True
+) -> List[ConfidenceResult]:
+    """
+    Calculate confidence scores for many assets at once.
+
+    Each asset is analyzed as in calculate_confidence_score, but the weighted sum of
+    the factor scores, the context/Twitter adjustments and the 0-100 clamp are
+    computed for the whole batch with NumPy instead of once per asset. Without
+    notes (verbose=False) the technical factors, direction and indicator agreement
+    are vectorized as well, the shared market context is scored once per direction
+    and only Twitter sentiment is evaluated per asset.
+
+    Args:
+        tech_indicators_list: Technical indicator dictionaries, one per asset.
+        prices: Current prices, aligned with tech_indicators_list (entries can be None).
+        market_context: Optional market context shared by all assets.
+        twitter_sentiments: Optional Twitter sentiment dictionaries, aligned with
+            tech_indicators_list (entries can be None).
+        verbose: Whether to build the supporting/conflicting indicator notes.
+
+    Returns:
+        A list of confidence dictionaries in the same format as calculate_confidence_score,
+        in the same order as the input.
+    """
+    if twitter_sentiments is None:
+        twitter_sentiments = [None] * len(tech_indicators_list)
+
+    if verbose:
+        factors = [
+            _score_factors(tech_indicators, price, market_context, twitter_sentiment)
+            for tech_indicators, price, twitter_sentiment in zip(tech_indicators_list, prices, twitter_sentiments)
+        ]
+        scored = [index for index, factor in enumerate(factors) if factor is not None]
+        factors = [factors[index] for index in scored]
+        factor_scores = [factor[0] for factor in factors]
+        directions = [factor[1] for factor in factors]
+        agreement_percents = [factor[3] for factor in factors]
+        notes = [(factor[5], factor[6]) for factor in factors]
+        # One row per asset: the weighted factor scores followed by the agreement score
+        factor_matrix = np.array(
+            [scores.weighted_factors() + (agreement_ratio * 10,)
+             for scores, _, agreement_ratio, _, _, _, _ in factors],
+            dtype=np.float64
+        )
+        adjustments = np.array([adjustment for _, _, _, _, adjustment, _, _ in factors], dtype=np.float64)
+    else:
+        # The notes need the per-asset rules, so only the note-free path is vectorized
+        price_column = np.array([np.nan if price is None else price for price in prices], dtype=np.float64)
+        technical, bullish, bearish, _, available = _score_technical_batch(
+            _indicator_columns(tech_indicators_list), price_column)
+        scored = np.flatnonzero(available >= MIN_INDICATORS_FOR_SIGNAL).tolist()
+        technical, bullish, bearish = technical[scored], bullish[scored], bearish[scored]
+
+        # Direction and indicator agreement from the votes, as in _score_context
+        direction_signs = np.sign(bullish - bearish)
+        directions = [_DIRECTION_BY_SIGN[sign] for sign in direction_signs.tolist()]
+        agreeing = np.where(direction_signs > 0, bullish, bearish)
+        total = np.where(direction_signs != 0, bullish + bearish, 0)
+        agreement_ratio = np.divide(agreeing, total, out=np.full(len(scored), 0.5), where=total > 0)
+        # Whole percentages rounded half to even, as _agreement_percent
+        percent, remainder = np.divmod(agreeing * 100, np.maximum(total, 1))
+        percent += (2 * remainder > total) | ((2 * remainder == total) & (percent % 2 == 1))
+        agreement_percents = np.where(total > 0, percent, 50).tolist()
+
+        # The market context is shared, so it is scored once per direction
+        adjustments = np.zeros(len(scored), dtype=np.float64)
+        if market_context:
+            market_scores = {
+                direction: _score_market_context(direction, market_context, _ignore_note, _ignore_note)
+                for direction in set(directions)
+            }
+            adjustments += [market_scores[direction][1] for direction in directions]
+
+        factor_scores = []
+        for index, (row, direction) in enumerate(zip(technical.tolist(), directions)):
+            scores = FactorScores(*row)
+            if market_context:
+                scores.market_context = market_scores[direction][0]
+            twitter_sentiment = twitter_sentiments[scored[index]]
+            if twitter_sentiment:
+                scores.twitter_sentiment, twitter_adjustment, _, _ = _score_twitter_sentiment(
+                    direction, twitter_sentiment)
+                adjustments[index] += twitter_adjustment
+            factor_scores.append(scores)
+        notes = [([], [])] * len(scored)
+        factor_matrix = np.column_stack((technical, agreement_ratio * 10))
+
+    if not scored:
+        return [_insufficient_data_result() for _ in tech_indicators_list]
+
+    weights = np.array(_FACTOR_WEIGHT_VALUES, dtype=np.float64)
+
+    # Accumulate the weighted columns in factor order, as _confidence_core does, so
+    # scores that land exactly on .5 round the same way as in the single-asset path
+    weighted_sum = np.zeros(len(scored), dtype=np.float64)
+    weighted_column = np.empty_like(weighted_sum)
+    for column, weight in enumerate(weights):
+        np.multiply(factor_matrix[:, column], weight, out=weighted_column)
+        weighted_sum += weighted_column
+    weighted_sum += adjustments
+
+    # Round and clamp in place; the scalar path does the same in _clamp100
+    np.rint(weighted_sum, out=weighted_sum)
+    np.clip(weighted_sum, 0, 100, out=weighted_sum)
+    overall_scores = weighted_sum.astype(np.int16)
+
+    # Assets with too few indicators get the insufficient-data result
+    results: List[Optional[ConfidenceResult]] = [None] * len(tech_indicators_list)
+    for index, scores, direction, agreement_percent, (final_supporting, final_conflicting), overall_score in zip(
+            scored, factor_scores, directions, agreement_percents, notes, overall_scores.tolist()):
+        signal = generate_trading_signal(overall_score, direction, prices[index], tech_indicators_list[index])
+        results[index] = _confidence_result(overall_score, direction, signal, scores,
+                                            final_supporting, final_conflicting, agreement_percent, verbose)
+    return [_insufficient_data_result() if result is None else result for result in results]
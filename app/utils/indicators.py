@@ -1,11 +1,332 @@
+import logging
+from functools import lru_cache
+import numpy as np
 import pandas as pd
-import pandas_ta as ta
-from typing import Dict, Optional, List # Import List
+from typing import Dict, Iterable, Optional, Tuple
+
+from app.utils._njit import NUMBA_AVAILABLE
+from app.utils.indicators_numba import fused_last, tail_finite, wilder_adx_last, window_mean, window_mean_std
+
+logger = logging.getLogger(__name__)
+
+# pandas_ta is optional; without it every indicator comes from the kernels in indicators_numba
+# (or, without Numba, from vectorized pandas/NumPy code giving the same values)
+try:
+    import pandas_ta as ta
+except ImportError:
+    ta = None
+
+# TA-Lib is optional too; when installed it is used ahead of pandas_ta
+try:
+    import talib
+except ImportError:
+    talib = None
+
+def _as_float(value) -> Optional[float]:
+    """Converts a kernel result to a float, or None for NaN."""
+    return None if np.isnan(value) else float(value)
+
+def _fill_indicators_from_talib(closes: np.ndarray, bars: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]],
+                                results: Dict[str, Optional[float]],
+                                sma_periods: Tuple[int, ...], ema_periods: Tuple[int, ...],
+                                bbands_length: int, bbands_std: int,
+                                macd_fast: int, macd_slow: int, macd_signal: int,
+                                adx_length: int) -> None:
+    """
+    Fills `results` with TA-Lib, from the same valid close prices and complete
+    (high, low, close) bars the kernels use. TA-Lib returns NaN until an indicator has enough data, so the last element of
+    each output is the latest value (or NaN when there is too little data).
+    """
+    results["rsi"] = _as_float(talib.RSI(closes, timeperiod=14)[-1])
+
+    macd, signal, hist = talib.MACD(closes, fastperiod=macd_fast, slowperiod=macd_slow, signalperiod=macd_signal)
+    results["macd"], results["macd_signal"], results["macd_hist"] = (
+        _as_float(macd[-1]), _as_float(signal[-1]), _as_float(hist[-1]))
+    for period in sma_periods:
+        results[f"sma_{period}"] = _as_float(talib.SMA(closes, timeperiod=period)[-1])
+    for period in ema_periods:
+        results[f"ema_{period}"] = _as_float(talib.EMA(closes, timeperiod=period)[-1])
+
+    upper, middle, lower = talib.BBANDS(closes, timeperiod=bbands_length, nbdevup=bbands_std, nbdevdn=bbands_std)
+    results["bb_upper"], results["bb_middle"], results["bb_lower"] = (
+        _as_float(upper[-1]), _as_float(middle[-1]), _as_float(lower[-1]))
+
+    if bars is not None:
+        high, low, close = bars
+        results["adx"] = _as_float(talib.ADX(high, low, close, timeperiod=adx_length)[-1])
+        results["adx_plus_di"] = _as_float(talib.PLUS_DI(high, low, close, timeperiod=adx_length)[-1])
+        results["adx_minus_di"] = _as_float(talib.MINUS_DI(high, low, close, timeperiod=adx_length)[-1])
+
+def _complete_bars(high: np.ndarray, low: np.ndarray,
+                   close: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Returns the high, low and close arrays of the bars that have all three prices."""
+    complete = ~(np.isnan(high) | np.isnan(low) | np.isnan(close))
+    return high[complete], low[complete], close[complete]
+
+def _price_array(series: pd.Series) -> np.ndarray:
+    """Returns a price column as a float64 array, with NaN for missing or non-numeric values."""
+    return pd.to_numeric(series, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+
+def _dataframe_bars(df: pd.DataFrame, close: np.ndarray) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Returns the complete (high, low, close) bars of a DataFrame, given its close
+    prices as an array, or None without high/low columns.
+    """
+    if 'high' not in df.columns or 'low' not in df.columns:
+        return None
+    return _complete_bars(_price_array(df['high']), _price_array(df['low']), close)
+
+def _wilder_average(values: np.ndarray, length: int) -> np.ndarray:
+    """
+    Wilder's moving average of each column of `values` from row `length - 1` on: the
+    mean of the first `length` rows, after that updated with weight 1/length.
+    """
+    seeded = np.concatenate((values[:length].mean(axis=0, keepdims=True), values[length:]))
+    return pd.DataFrame(seeded).ewm(alpha=1.0 / length, adjust=False).mean().to_numpy()
+
+def _rsi_last(closes: np.ndarray, length: int) -> float:
+    """Latest RSI with Wilder's smoothing, or NaN; the RSI of indicators_numba.fused_last, vectorized."""
+    if len(closes) <= length:
+        return np.nan
+    changes = np.diff(closes)
+    avg_gain, avg_loss = _wilder_average(np.column_stack((np.clip(changes, 0.0, None),
+                                                          np.clip(-changes, 0.0, None))), length)[-1]
+    if avg_loss == 0:
+        return 100.0 if avg_gain > 0 else np.nan
+    return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+def _macd_last(closes: np.ndarray, fast: int, slow: int, signal: int) -> Tuple[float, float, float]:
+    """Latest (MACD, signal, histogram) from ewm(span, adjust=False); the MACD of fused_last, vectorized."""
+    if len(closes) == 0:
+        return np.nan, np.nan, np.nan
+    prices = pd.Series(closes)
+    line = prices.ewm(span=fast, adjust=False).mean() - prices.ewm(span=slow, adjust=False).mean()
+    macd, macd_signal = line.iloc[-1], line.ewm(span=signal, adjust=False).mean().iloc[-1]
+    return macd, macd_signal, macd - macd_signal
+
+def _adx_last(high: np.ndarray, low: np.ndarray, close: np.ndarray, length: int) -> Tuple[float, float, float]:
+    """indicators_numba.wilder_adx_last, vectorized: the latest (ADX, +DI, -DI), NaN with too few bars."""
+    if len(close) <= length:
+        return np.nan, np.nan, np.nan
+    prev_close = close[:-1]
+    tr = np.maximum(high[1:] - low[1:], np.maximum(np.abs(high[1:] - prev_close), np.abs(low[1:] - prev_close)))
+    up = high[1:] - high[:-1]
+    down = low[:-1] - low[1:]
+    plus_dm = np.where((up > down) & (up > 0), up, 0.0)
+    minus_dm = np.where((down > up) & (down > 0), down, 0.0)
+    tr_avg, plus_avg, minus_avg = _wilder_average(np.column_stack((tr, plus_dm, minus_dm)), length).T
+    with np.errstate(divide='ignore', invalid='ignore'):
+        plus_di = np.where(tr_avg > 0, 100.0 * plus_avg / tr_avg, 0.0)
+        minus_di = np.where(tr_avg > 0, 100.0 * minus_avg / tr_avg, 0.0)
+        di_sum = plus_di + minus_di
+        dx = np.where(di_sum > 0, 100.0 * np.abs(plus_di - minus_di) / di_sum, 0.0)
+    adx = _wilder_average(dx[:, np.newaxis], length)[-1, 0] if len(dx) >= length else np.nan
+    return adx, plus_di[-1], minus_di[-1]
+
+# Result keys of the indicator groups the kernels compute together
+_RSI_MACD_KEYS = frozenset(("rsi", "macd", "macd_signal", "macd_hist"))
+_BBANDS_KEYS = frozenset(("bb_upper", "bb_middle", "bb_lower"))
+_ADX_KEYS = frozenset(("adx", "adx_plus_di", "adx_minus_di"))
+
+def _fill_indicators_from_kernels(closes: np.ndarray, bars: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]],
+                                  results: Dict[str, Optional[float]], keys: Iterable[str],
+                                  sma_periods: Tuple[int, ...], ema_periods: Tuple[int, ...],
+                                  bbands_length: int, bbands_std: int,
+                                  macd_fast: int, macd_slow: int, macd_signal: int,
+                                  adx_length: int) -> None:
+    """
+    Fills `results` from the NumPy kernels, for the indicator `keys` TA-Lib or pandas_ta did not provide.
+    `closes` holds the valid (non-NaN) close prices and `bars` the complete
+    (high, low, close) bars, or None when there are no high/low prices. The
+    prices may be float32; sums and averages are always kept in float64.
+
+    Only the latest values are computed, and only for the indicators in `keys`:
+    windowed indicators (SMA, Bollinger Bands) look at the last window only, RSI,
+    the requested EMAs and MACD share one pass over the closes, and ADX is one pass
+    over the complete bars. Those passes are only fast compiled, so without Numba
+    the same values come from vectorized pandas/NumPy code, equal up to rounding.
+    """
+    keys = frozenset(keys)
+    ema_periods = tuple(period for period in ema_periods if f"ema_{period}" in keys)
+    if not NUMBA_AVAILABLE:
+        _fill_indicators_vectorized(closes, bars, results, keys, sma_periods, ema_periods, bbands_length,
+                                    bbands_std, macd_fast, macd_slow, macd_signal, adx_length)
+        return
+    if ema_periods or not keys.isdisjoint(_RSI_MACD_KEYS):
+        rsi, emas, macd, signal, hist = fused_last(closes, np.asarray(ema_periods, dtype=np.float64), 14,
+                                                   macd_fast, macd_slow, macd_signal)
+        results["rsi"] = _as_float(rsi)
+        results["macd"], results["macd_signal"], results["macd_hist"] = _as_float(macd), _as_float(signal), _as_float(hist)
+        for period, ema in zip(ema_periods, emas):
+            results[f"ema_{period}"] = _as_float(ema)
+
+    for period in sma_periods:
+        if f"sma_{period}" in keys and len(closes) >= period:
+            results[f"sma_{period}"] = float(window_mean(closes, period))
+
+    if not keys.isdisjoint(_BBANDS_KEYS) and len(closes) >= bbands_length:
+        middle, std = window_mean_std(closes, bbands_length)  # Population standard deviation, as pandas_ta
+        results["bb_upper"], results["bb_middle"], results["bb_lower"] = (
+            float(middle + bbands_std * std), float(middle), float(middle - bbands_std * std))
+
+    if not keys.isdisjoint(_ADX_KEYS) and bars is not None:
+        adx, plus_di, minus_di = wilder_adx_last(*bars, adx_length)
+        results["adx"], results["adx_plus_di"], results["adx_minus_di"] = (
+            _as_float(adx), _as_float(plus_di), _as_float(minus_di))
+
+def _fill_indicators_vectorized(closes: np.ndarray, bars: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]],
+                                results: Dict[str, Optional[float]], keys: frozenset,
+                                sma_periods: Tuple[int, ...], ema_periods: Tuple[int, ...],
+                                bbands_length: int, bbands_std: int,
+                                macd_fast: int, macd_slow: int, macd_signal: int,
+                                adx_length: int) -> None:
+    """_fill_indicators_from_kernels without Numba; `ema_periods` are the requested EMAs only."""
+    closes = closes.astype(np.float64, copy=False)
+    if not keys.isdisjoint(_RSI_MACD_KEYS):
+        results["rsi"] = _as_float(_rsi_last(closes, 14))
+        macd, signal, hist = _macd_last(closes, macd_fast, macd_slow, macd_signal)
+        results["macd"], results["macd_signal"], results["macd_hist"] = _as_float(macd), _as_float(signal), _as_float(hist)
+    prices = pd.Series(closes)
+    for period in ema_periods:
+        if len(closes) >= period:  # Too few prices leave the seed dominating the EMA
+            results[f"ema_{period}"] = float(prices.ewm(span=period, adjust=False).mean().iloc[-1])
+
+    for period in sma_periods:
+        if f"sma_{period}" in keys and len(closes) >= period:
+            results[f"sma_{period}"] = float(closes[-period:].mean())
+
+    if not keys.isdisjoint(_BBANDS_KEYS) and len(closes) >= bbands_length:
+        window = closes[-bbands_length:]
+        middle = window.mean()
+        width = bbands_std * window.std()  # Population standard deviation, as pandas_ta
+        results["bb_upper"], results["bb_middle"], results["bb_lower"] = (
+            float(middle + width), float(middle), float(middle - width))
+
+    if not keys.isdisjoint(_ADX_KEYS) and bars is not None:
+        adx, plus_di, minus_di = _adx_last(*(np.asarray(bar, dtype=np.float64) for bar in bars), adx_length)
+        results["adx"], results["adx_plus_di"], results["adx_minus_di"] = (
+            _as_float(adx), _as_float(plus_di), _as_float(minus_di))
+
+def _tail_finite(series: pd.Series) -> Optional[float]:
+    """
+    Returns the last finite value of a Series as a float, or None if there is none.
+    Walks back from the end, so a column whose NaNs are all in the warm-up at the
+    start costs a single element check.
+    """
+    return _as_float(tail_finite(series.to_numpy(dtype=np.float64, na_value=np.nan)))
+
+# pandas_ta result column names, built once per parameter set
+@lru_cache(maxsize=32)
+def _macd_columns(fast: int, slow: int, signal: int) -> Tuple[str, str, str]:
+    """Returns the pandas_ta (MACD, signal, histogram) column names."""
+    return f'MACD_{fast}_{slow}_{signal}', f'MACDs_{fast}_{slow}_{signal}', f'MACDh_{fast}_{slow}_{signal}'
+
+@lru_cache(maxsize=32)
+def _adx_columns(length: int) -> Tuple[str, str, str]:
+    """Returns the pandas_ta (ADX, +DI, -DI) column names."""
+    return f'ADX_{length}', f'DMP_{length}', f'DMN_{length}'
+
+@lru_cache(maxsize=32)
+def _bbands_columns(length: int, std: int) -> Tuple[str, str, str]:
+    """Returns the pandas_ta (upper, middle, lower) Bollinger Band column names."""
+    return f'BBU_{length}_{std}.0', f'BBM_{length}_{std}.0', f'BBL_{length}_{std}.0'
+
+@lru_cache(maxsize=32)
+def _result_columns(sma_periods: Tuple[int, ...], ema_periods: Tuple[int, ...],
+                    bbands_length: int, bbands_std: int, macd_fast: int, macd_slow: int,
+                    macd_signal: int, adx_length: int) -> Tuple[Tuple[str, Optional[str]], ...]:
+    """
+    Returns the (result key, pandas_ta column) pairs for one parameter set. The moving
+    averages are never taken from pandas_ta, so their column is None.
+    """
+    return (
+        ("rsi", 'RSI_14'),
+        *zip(("macd", "macd_signal", "macd_hist"), _macd_columns(macd_fast, macd_slow, macd_signal)),
+        *((f"sma_{period}", None) for period in sma_periods),
+        *((f"ema_{period}", None) for period in ema_periods),
+        *zip(("adx", "adx_plus_di", "adx_minus_di"), _adx_columns(adx_length)),
+        *zip(("bb_upper", "bb_middle", "bb_lower"), _bbands_columns(bbands_length, bbands_std)),
+    )
+
+@lru_cache(maxsize=32)
+def _indicator_strategy(bbands_length: int, bbands_std: int, macd_fast: int, macd_slow: int,
+                        macd_signal: int, adx_length: int) -> "ta.Strategy":
+    """Builds the pandas_ta Strategy computing RSI, MACD, ADX and Bollinger Bands for one parameter set."""
+    return ta.Strategy(name="technical_indicators", ta=[
+        {"kind": "rsi"},
+        {"kind": "macd", "fast": macd_fast, "slow": macd_slow, "signal": macd_signal},
+        {"kind": "adx", "length": adx_length},
+        {"kind": "bbands", "length": bbands_length, "std": bbands_std},
+    ])
+
+def _run_indicator_strategy(df: pd.DataFrame, bbands_length: int, bbands_std: int, macd_fast: int,
+                            macd_slow: int, macd_signal: int, adx_length: int) -> pd.DataFrame:
+    """
+    Runs the pandas_ta indicators in one Strategy call on a copy of the price columns.
+
+    Returns the copy with the indicator columns appended. If the strategy fails, the
+    copy is returned without them and the indicators come from the NumPy kernels.
+    """
+    frame = df[[col for col in ('open', 'high', 'low', 'close', 'volume') if col in df.columns]].copy()
+    try:
+        analysis = frame.ta
+        analysis.cores = 0  # A worker pool costs more than it saves on these small frames
+        analysis.strategy(_indicator_strategy(bbands_length, bbands_std, macd_fast, macd_slow,
+                                             macd_signal, adx_length), append=True)
+    except Exception as e:
+        logger.warning("pandas_ta strategy failed: %s", e)
+    return frame
+
+# Recently calculated indicators: {key: results}. The key identifies the DataFrame by a hash
+# of its column names, index and values, plus the indicator parameters, so the same prices
+# fetched again (e.g. re-scanning a coin) reuse the results.
+_INDICATOR_CACHE: Dict[tuple, Dict[str, Optional[float]]] = {}
+_INDICATOR_CACHE_SIZE = 256
+
+def _indicator_cache_key(df: pd.DataFrame, *params) -> Optional[tuple]:
+    """
+    Builds the indicator cache key for a DataFrame, or None if it cannot be cached.
+    Only numeric, datetime and similar fixed-width data is hashed; object columns
+    (whose bytes are pointers, not values) make the DataFrame uncacheable.
+    """
+    if df is None or df.empty:
+        return None
+    arrays = [df.index.to_numpy(), *(values.to_numpy() for _, values in df.items())]
+    if any(array.dtype.hasobject for array in arrays):
+        return None
+    try:
+        key = (tuple(df.columns), *(hash(array.tobytes()) for array in arrays)) + params
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+def _normalized_prices(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Returns a shallow copy of `df` with lowercase column names and numeric closes,
+    as the indicators read it. The caller's DataFrame is left unchanged, so the same
+    prices give the same cache key however often they are passed in.
+    """
+    if df is None or df.empty:
+        return df
+    frame = df.copy(deep=False)
+    if not all(isinstance(col, str) and col.islower() for col in frame.columns):
+        frame.columns = frame.columns.str.lower()
+    if 'close' in frame.columns:
+        frame['close'] = pd.to_numeric(frame['close'], errors='coerce')
+    return frame
+
+# Define default periods for various indicators. Tuples, so the shared defaults
+# cannot be mutated by a caller and can be used directly in the cache keys.
+DEFAULT_SMA_PERIODS = (50,)
+DEFAULT_EMA_PERIODS = (9, 21, 55)
+
+# Price columns the indicators need, after lowercasing
+_REQUIRED_COLUMNS = frozenset(('open', 'high', 'low', 'close'))
 
-# Define default periods for various indicators
 def calculate_technical_indicators(df: pd.DataFrame,
-                               sma_periods: List[int] = [50],
-                               ema_periods: List[int] = [9, 21, 55],
+                               sma_periods: Iterable[int] = DEFAULT_SMA_PERIODS,
+                               ema_periods: Iterable[int] = DEFAULT_EMA_PERIODS,
                                bbands_length: int = 20,
                                bbands_std: int = 2,
                                macd_fast: int = 8,
@@ -13,13 +334,16 @@ def calculate_technical_indicators(df: pd.DataFrame,
                                macd_signal: int = 9,
                                adx_length: int = 14) -> Dict[str, Optional[float]]:
     """
-    Calculates technical indicators (RSI, MACD, SMA, EMA, ADX, Bollinger Bands) using pandas-ta.
+    Calculates technical indicators (RSI, MACD, SMA, EMA, ADX, Bollinger Bands) using TA-Lib,
+    or pandas-ta when TA-Lib is not installed. If neither is installed, the indicators are
+    computed with the kernels in app.utils.indicators_numba when Numba is installed,
+    or with equivalent vectorized pandas/NumPy code when it is not.
 
     Args:
         df: A pandas DataFrame with 'open', 'high', 'low', 'close' columns,
-            indexed by datetime.
-        sma_periods: List of periods for Simple Moving Average calculation.
-        ema_periods: List of periods for Exponential Moving Average calculation.
+            indexed by datetime. It is not modified.
+        sma_periods: Periods for Simple Moving Average calculation (a tuple; lists are accepted).
+        ema_periods: Periods for Exponential Moving Average calculation (a tuple; lists are accepted).
         bbands_length: Period for Bollinger Bands calculation.
         bbands_std: Standard deviation multiplier for Bollinger Bands.
         macd_fast: Fast period for MACD calculation.
@@ -30,8 +354,31 @@ def calculate_technical_indicators(df: pd.DataFrame,
     Returns:
         A dictionary containing the latest calculated indicator values.
         Returns None for an indicator if calculation fails or data is insufficient.
+        Results are reused when called again with a DataFrame holding the same
+        columns, index and values, and the same parameters.
     """
-    # Initialize results dictionary with all expected keys
+    # Work with immutable, hashable period tuples from here on
+    sma_periods, ema_periods = tuple(sma_periods), tuple(ema_periods)
+    # Hash the prices as they are computed, not as passed in
+    df = _normalized_prices(df)
+    key = _indicator_cache_key(df, sma_periods, ema_periods, bbands_length, bbands_std,
+                               macd_fast, macd_slow, macd_signal, adx_length)
+    if key is not None:
+        cached = _INDICATOR_CACHE.get(key)
+        if cached is not None:
+            return dict(cached)
+
+    results = _compute_technical_indicators(df, sma_periods, ema_periods, bbands_length, bbands_std,
+                                            macd_fast, macd_slow, macd_signal, adx_length)
+
+    if key is not None:
+        if key not in _INDICATOR_CACHE and len(_INDICATOR_CACHE) >= _INDICATOR_CACHE_SIZE:
+            del _INDICATOR_CACHE[next(iter(_INDICATOR_CACHE))]  # Evict the oldest entry
+        _INDICATOR_CACHE[key] = dict(results)
+    return results
+
+def _empty_results(sma_periods: Tuple[int, ...], ema_periods: Tuple[int, ...]) -> Dict[str, Optional[float]]:
+    """Returns the results dictionary with every expected key set to None."""
     results = {
         "rsi": None, "macd": None, "macd_signal": None, "macd_hist": None,
         "bb_upper": None, "bb_middle": None, "bb_lower": None,
@@ -45,268 +392,79 @@ def calculate_technical_indicators(df: pd.DataFrame,
     # Add EMA periods
     for period in ema_periods:
         results[f"ema_{period}"] = None
+    return results
+
+def _compute_technical_indicators(df: pd.DataFrame,
+                                  sma_periods: Tuple[int, ...],
+                                  ema_periods: Tuple[int, ...],
+                                  bbands_length: int,
+                                  bbands_std: int,
+                                  macd_fast: int,
+                                  macd_slow: int,
+                                  macd_signal: int,
+                                  adx_length: int) -> Dict[str, Optional[float]]:
+    """
+    Calculates the indicators for calculate_technical_indicators without caching.
+    `df` must already be normalized by _normalized_prices (lowercase column names,
+    numeric closes).
+    """
+    results = _empty_results(sma_periods, ema_periods)
 
     if df is None or df.empty:
-        print("Warning: DataFrame is empty, cannot calculate indicators.")
+        logger.warning("DataFrame is empty, cannot calculate indicators.")
         return results # Return initialized dict
 
-    # Ensure required columns exist (case-insensitive check)
-    required_columns = ['open', 'high', 'low', 'close']
+    # Ensure required columns exist (names are lowercase already)
     # Ensure 'close' column exists for most indicators
-    df.columns = df.columns.str.lower() # Normalize column names
     if 'close' not in df.columns:
-         print(f"Warning: DataFrame missing 'close' column, essential for most indicators.")
+         logger.warning("DataFrame missing 'close' column, essential for most indicators.")
          return results # Return initialized dict
-    if not all(col in df.columns for col in required_columns):
-        print(f"Warning: DataFrame missing one or more required columns for some indicators: {required_columns}")
+    missing_columns = _REQUIRED_COLUMNS.difference(df.columns)
+    if missing_columns:
+        logger.warning("DataFrame missing one or more required columns for some indicators: %s",
+                       sorted(missing_columns))
         # Proceed with calculations that are possible
 
-    # --- Calculate Indicators ---
-
-    # RSI (Relative Strength Index)
-    try:
-        # First try using pandas_ta
-        try:
-            rsi_series = df.ta.rsi()
-            # Get the last non-NaN value
-            last_rsi = rsi_series.dropna().iloc[-1] if not rsi_series.dropna().empty else None
-            results["rsi"] = float(last_rsi) if last_rsi is not None else None
-        except Exception as e:
-            print(f"pandas_ta RSI calculation failed, trying manual calculation: {e}")
-
-            # Fallback to manual RSI calculation if pandas_ta fails
-            if 'close' in df.columns:
-                # Ensure close column is numeric
-                df['close'] = pd.to_numeric(df['close'], errors='coerce')
-                # Drop any NaN values
-                df_clean = df.dropna(subset=['close'])
-
-                # Calculate price changes
-                delta = df_clean['close'].diff()
-
-                # Get gains and losses
-                gain = delta.where(delta > 0, 0)
-                loss = -delta.where(delta < 0, 0)
-
-                # Calculate average gain and loss over 14 periods (standard RSI)
-                avg_gain = gain.rolling(window=14).mean()
-                avg_loss = loss.rolling(window=14).mean()
-
-                # Calculate RS and RSI
-                rs = avg_gain / avg_loss
-                rsi_manual = 100 - (100 / (1 + rs))
-
-                # Get the last value
-                last_rsi_manual = rsi_manual.dropna().iloc[-1] if not rsi_manual.dropna().empty else None
-
-                # Explicitly convert to float with error handling
-                try:
-                    results["rsi"] = float(last_rsi_manual) if last_rsi_manual is not None else None
-                    print("Successfully calculated RSI using manual method")
-                except (ValueError, TypeError) as e:
-                    print(f"Error converting manual RSI to float: {e}")
-                    results["rsi"] = None
-            else:
-                print("Cannot calculate RSI: 'close' column not found")
-                results["rsi"] = None
-    except Exception as e:
-        print(f"Error calculating RSI: {e}")
-        results["rsi"] = None
-
-    # MACD (Moving Average Convergence Divergence) - Shorter Period
-    try:
-        # First try using pandas_ta
-        try:
-            macd_df = df.ta.macd(fast=macd_fast, slow=macd_slow, signal=macd_signal)
-            if macd_df is not None and not macd_df.empty:
-                # Column names depend on the parameters used
-                macd_col = f'MACD_{macd_fast}_{macd_slow}_{macd_signal}'
-                signal_col = f'MACDs_{macd_fast}_{macd_slow}_{macd_signal}'
-                hist_col = f'MACDh_{macd_fast}_{macd_slow}_{macd_signal}'
-
-                last_macd = macd_df[macd_col].dropna().iloc[-1] if not macd_df[macd_col].dropna().empty else None
-                last_signal = macd_df[signal_col].dropna().iloc[-1] if not macd_df[signal_col].dropna().empty else None
-                last_hist = macd_df[hist_col].dropna().iloc[-1] if not macd_df[hist_col].dropna().empty else None
-
-                results["macd"] = float(last_macd) if last_macd is not None else None
-                results["macd_signal"] = float(last_signal) if last_signal is not None else None
-                results["macd_hist"] = float(last_hist) if last_hist is not None else None
-            else:
-                raise Exception("pandas_ta MACD returned None or empty DataFrame")
-        except Exception as e:
-            print(f"pandas_ta MACD calculation failed, trying manual calculation: {e}")
-
-            # Fallback to manual MACD calculation if pandas_ta fails
-            if 'close' in df.columns:
-                # Ensure close column is numeric
-                df['close'] = pd.to_numeric(df['close'], errors='coerce')
-                # Drop any NaN values
-                df_clean = df.dropna(subset=['close'])
-
-                # Calculate EMAs for MACD
-                ema_fast = df_clean['close'].ewm(span=macd_fast, adjust=False).mean()
-                ema_slow = df_clean['close'].ewm(span=macd_slow, adjust=False).mean()
-
-                # Calculate MACD line
-                macd_line = ema_fast - ema_slow
-
-                # Calculate signal line
-                signal_line = macd_line.ewm(span=macd_signal, adjust=False).mean()
-
-                # Calculate histogram
-                histogram = macd_line - signal_line
-
-                # Get the last values
-                last_macd_manual = macd_line.iloc[-1] if not macd_line.empty else None
-                last_signal_manual = signal_line.iloc[-1] if not signal_line.empty else None
-                last_hist_manual = histogram.iloc[-1] if not histogram.empty else None
-
-                # Explicitly convert to float with error handling
-                try:
-                    results["macd"] = float(last_macd_manual) if last_macd_manual is not None else None
-                    results["macd_signal"] = float(last_signal_manual) if last_signal_manual is not None else None
-                    results["macd_hist"] = float(last_hist_manual) if last_hist_manual is not None else None
-                    print("Successfully calculated MACD using manual method")
-                except (ValueError, TypeError) as e:
-                    print(f"Error converting manual MACD to float: {e}")
-                    results["macd"] = None
-                    results["macd_signal"] = None
-                    results["macd_hist"] = None
-            else:
-                print("Cannot calculate MACD: 'close' column not found")
-                results["macd"] = None
-                results["macd_signal"] = None
-                results["macd_hist"] = None
-    except Exception as e:
-        print(f"Error calculating MACD ({macd_fast},{macd_slow},{macd_signal}): {e}")
-        results["macd"] = None
-        results["macd_signal"] = None
-        results["macd_hist"] = None
+    # 'close' was coerced to numbers by _normalized_prices; take it as a float64 array
+    # once, the NumPy kernels work on the valid closes only
+    close = df['close'].to_numpy(dtype=np.float64, na_value=np.nan)
 
-    # Simple Moving Averages (SMA)
-    for period in sma_periods:
-        try:
-            # First try using pandas_ta
-            try:
-                sma_series = df.ta.sma(length=period)
-                if sma_series is not None and not sma_series.empty:
-                    last_sma = sma_series.dropna().iloc[-1]
-                    results[f"sma_{period}"] = float(last_sma) if last_sma is not None else None
-                    continue  # Skip to next period if successful
-            except Exception as e:
-                print(f"pandas_ta SMA {period} calculation failed, trying pandas directly: {e}")
-
-            # Fallback to pandas rolling if pandas_ta fails
-            if 'close' in df.columns:
-                # Ensure close column is numeric
-                df['close'] = pd.to_numeric(df['close'], errors='coerce')
-                # Drop any NaN values
-                df_clean = df.dropna(subset=['close'])
-                # Calculate SMA using pandas
-                sma_pd = df_clean['close'].rolling(window=period).mean()
-                if not sma_pd.empty:
-                    last_sma_pd = sma_pd.dropna().iloc[-1] if not sma_pd.dropna().empty else None
-                    # Explicitly convert to float with error handling
-                    try:
-                        results[f"sma_{period}"] = float(last_sma_pd) if last_sma_pd is not None else None
-                        print(f"Successfully calculated SMA {period} using pandas rolling")
-                    except (ValueError, TypeError) as e:
-                        print(f"Error converting SMA {period} to float: {e}, value: {last_sma_pd}, type: {type(last_sma_pd)}")
-                        results[f"sma_{period}"] = None
-                else:
-                    print(f"SMA {period} calculation resulted in empty series")
-                    results[f"sma_{period}"] = None
-            else:
-                print(f"Cannot calculate SMA {period}: 'close' column not found")
-                results[f"sma_{period}"] = None
-        except Exception as e:
-            print(f"Error calculating SMA {period}: {e}")
-            results[f"sma_{period}"] = None
+    # --- Calculate Indicators ---
 
-    # Exponential Moving Averages (EMA)
-    for period in ema_periods:
+    columns = _result_columns(sma_periods, ema_periods, bbands_length, bbands_std,
+                              macd_fast, macd_slow, macd_signal, adx_length)
+    closes = close[~np.isnan(close)]
+    bars = _dataframe_bars(df, close)
+    if talib is not None:
+        # TA-Lib's C implementations, straight on the price arrays
         try:
-            # First try using pandas_ta
-            try:
-                ema_series = df.ta.ema(length=period)
-                if ema_series is not None and not ema_series.empty:
-                    last_ema = ema_series.dropna().iloc[-1]
-                    results[f"ema_{period}"] = float(last_ema) if last_ema is not None else None
-                    continue  # Skip to next period if successful
-            except Exception as e:
-                print(f"pandas_ta EMA {period} calculation failed, trying pandas directly: {e}")
-
-            # Fallback to pandas ewm if pandas_ta fails
-            if 'close' in df.columns:
-                # Ensure close column is numeric
-                df['close'] = pd.to_numeric(df['close'], errors='coerce')
-                # Drop any NaN values
-                df_clean = df.dropna(subset=['close'])
-                # Calculate EMA using pandas
-                ema_pd = df_clean['close'].ewm(span=period, adjust=False).mean()
-                if not ema_pd.empty:
-                    last_ema_pd = ema_pd.iloc[-1]
-                    # Explicitly convert to float with error handling
-                    try:
-                        results[f"ema_{period}"] = float(last_ema_pd)
-                        print(f"Successfully calculated EMA {period} using pandas ewm")
-                    except (ValueError, TypeError) as e:
-                        print(f"Error converting EMA {period} to float: {e}, value: {last_ema_pd}, type: {type(last_ema_pd)}")
-                        results[f"ema_{period}"] = None
-            else:
-                print(f"Cannot calculate EMA {period}: 'close' column not found")
-                results[f"ema_{period}"] = None
+            _fill_indicators_from_talib(closes, bars, results, sma_periods, ema_periods, bbands_length, bbands_std,
+                                        macd_fast, macd_slow, macd_signal, adx_length)
         except Exception as e:
-            print(f"Error calculating EMA {period}: {e}")
-            results[f"ema_{period}"] = None
-
-    # Average Directional Index (ADX)
-    try:
-        adx_df = df.ta.adx(length=adx_length)
-        if adx_df is not None and not adx_df.empty:
-            # Column names for ADX indicators
-            adx_col = f'ADX_{adx_length}'
-            plus_di_col = f'DMP_{adx_length}'
-            minus_di_col = f'DMN_{adx_length}'
-
-            last_adx = adx_df[adx_col].dropna().iloc[-1] if not adx_df[adx_col].dropna().empty else None
-            last_plus_di = adx_df[plus_di_col].dropna().iloc[-1] if not adx_df[plus_di_col].dropna().empty else None
-            last_minus_di = adx_df[minus_di_col].dropna().iloc[-1] if not adx_df[minus_di_col].dropna().empty else None
-
-            results["adx"] = float(last_adx) if last_adx is not None else None
-            results["adx_plus_di"] = float(last_plus_di) if last_plus_di is not None else None
-            results["adx_minus_di"] = float(last_minus_di) if last_minus_di is not None else None
-        # else: results remain None
-    except KeyError as e:
-        print(f"KeyError calculating ADX (likely column name mismatch or insufficient data): {e}")
-        # results remain None
-    except Exception as e:
-        print(f"Error calculating ADX (length={adx_length}): {e}")
-        # results remain None
-
-    # Bollinger Bands (BBands)
-    try:
-        bbands_df = df.ta.bbands(length=bbands_length, std=bbands_std)
-        if bbands_df is not None and not bbands_df.empty:
-            # Column names depend on parameters
-            upper_col = f'BBU_{bbands_length}_{bbands_std}.0'
-            middle_col = f'BBM_{bbands_length}_{bbands_std}.0'
-            lower_col = f'BBL_{bbands_length}_{bbands_std}.0'
-
-            last_upper = bbands_df[upper_col].dropna().iloc[-1] if not bbands_df[upper_col].dropna().empty else None
-            last_middle = bbands_df[middle_col].dropna().iloc[-1] if not bbands_df[middle_col].dropna().empty else None
-            last_lower = bbands_df[lower_col].dropna().iloc[-1] if not bbands_df[lower_col].dropna().empty else None
-
-            results["bb_upper"] = float(last_upper) if last_upper is not None else None
-            results["bb_middle"] = float(last_middle) if last_middle is not None else None
-            results["bb_lower"] = float(last_lower) if last_lower is not None else None
-        # else: results remain None
-    except KeyError as e:
-        print(f"KeyError calculating Bollinger Bands (likely column name mismatch or insufficient data): {e}")
-        # results remain None
-    except Exception as e:
-        print(f"Error calculating Bollinger Bands ({bbands_length},{bbands_std}): {e}")
-        # results remain None
+            logger.warning("TA-Lib calculation failed: %s", e)
+    elif ta is not None:
+        # pandas_ta output for RSI, MACD, ADX and Bollinger Bands, from a single strategy run. The
+        # SMAs and EMAs skip its accessor dispatch and come straight from the price array below.
+        ta_frame = _run_indicator_strategy(df, bbands_length, bbands_std,
+                                           macd_fast, macd_slow, macd_signal, adx_length)
+        for key, column in columns:
+            if column in ta_frame.columns:
+                results[key] = _tail_finite(ta_frame[column])
+        unavailable = [key for key, column in columns if column is not None and results[key] is None]
+        if unavailable:
+            logger.info("pandas_ta gave no value for %s, using manual calculations", ", ".join(unavailable))
+
+    # Anything TA-Lib or pandas_ta did not provide (or everything, without either) comes from the kernels
+    missing = [key for key, _ in columns if results[key] is None]
+    if missing:
+        if talib is not None:
+            logger.info("TA-Lib gave no value for %s, using manual calculations", ", ".join(missing))
+        fallback: Dict[str, Optional[float]] = {}
+        _fill_indicators_from_kernels(closes, bars, fallback, missing,
+                                      sma_periods, ema_periods, bbands_length, bbands_std,
+                                      macd_fast, macd_slow, macd_signal, adx_length)
+        for key in missing:
+            results[key] = fallback.get(key)
 
     return results
 
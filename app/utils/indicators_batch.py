@@ -0,0 +1,129 @@
+"""
+Technical indicators for many coins at once.
+
+The price histories of all coins are stacked into 2D (coins, bars) arrays,
+padded with NaN where a coin has fewer bars. Every coin is computed with the
+same kernels as calculate_technical_indicators, without the per-DataFrame
+column handling, pandas_ta/TA-Lib dispatch and result caching.
+
+The arrays may be float32 to halve their memory when batching many coins;
+the indicator math itself stays in float64.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Optional
+
+from app.utils._njit import NUMBA_AVAILABLE
+from app.utils.indicators import (
+    DEFAULT_EMA_PERIODS,
+    DEFAULT_SMA_PERIODS,
+    _as_float,
+    _complete_bars,
+    _empty_results,
+    _fill_indicators_from_kernels,
+    _price_array,
+)
+from app.utils.indicators_numba import BATCH_COLUMNS, batch_last
+
+def _price_rows(values) -> np.ndarray:
+    """Returns 2D prices as a float32 or float64 array, converting other types to float64."""
+    values = np.asarray(values)
+    if values.dtype != np.float32:
+        values = values.astype(np.float64, copy=False)
+    return values
+
+def calculate_indicators_batch(closes: np.ndarray,
+                               highs: Optional[np.ndarray] = None,
+                               lows: Optional[np.ndarray] = None,
+                               sma_periods: Iterable[int] = DEFAULT_SMA_PERIODS,
+                               ema_periods: Iterable[int] = DEFAULT_EMA_PERIODS,
+                               bbands_length: int = 20,
+                               bbands_std: int = 2,
+                               macd_fast: int = 8,
+                               macd_slow: int = 17,
+                               macd_signal: int = 9,
+                               adx_length: int = 14) -> List[Dict[str, Optional[float]]]:
+    """
+    Calculates the latest technical indicators for every row of 2D price arrays.
+    With Numba installed, the coins are computed in parallel by one kernel;
+    without it, one coin at a time with calculate_technical_indicators' vectorized code.
+
+    Args:
+        closes: Close prices, shape (coins, bars), with NaN for missing bars or padding.
+            float32 prices are used as they are, anything else as float64.
+        highs: High prices with the same shape, or None to skip ADX.
+        lows: Low prices with the same shape, or None to skip ADX.
+        Other arguments as for calculate_technical_indicators.
+
+    Returns:
+        One indicator dictionary per row, with the same keys and values as
+        calculate_technical_indicators gives for that coin's DataFrame when
+        neither TA-Lib nor pandas_ta is installed.
+    """
+    sma_periods, ema_periods = tuple(sma_periods), tuple(ema_periods)
+    closes = _price_rows(closes)
+    if highs is not None and lows is not None:
+        highs, lows = _price_rows(highs), _price_rows(lows)
+    else:
+        highs = lows = np.empty((0, closes.shape[1]), dtype=closes.dtype)
+
+    if not NUMBA_AVAILABLE:
+        # The batch kernel would run as plain Python loops, so go through the per-coin vectorized path
+        batch = []
+        keys = _empty_results(sma_periods, ema_periods).keys()
+        with_bars = len(highs) == len(closes) and len(lows) == len(closes)
+        for c, row in enumerate(closes.astype(np.float64, copy=False)):
+            results = _empty_results(sma_periods, ema_periods)
+            bars = None
+            if with_bars:
+                bars = _complete_bars(highs[c].astype(np.float64), lows[c].astype(np.float64), row)
+            _fill_indicators_from_kernels(row[~np.isnan(row)], bars, results, keys, sma_periods, ema_periods,
+                                          bbands_length, bbands_std, macd_fast, macd_slow, macd_signal, adx_length)
+            batch.append(results)
+        return batch
+
+    values = batch_last(closes, highs, lows, np.asarray(sma_periods, dtype=np.int64),
+                        np.asarray(ema_periods, dtype=np.float64), 14, macd_fast, macd_slow, macd_signal,
+                        bbands_length, bbands_std, adx_length)
+    keys = (*BATCH_COLUMNS, *(f"sma_{period}" for period in sma_periods),
+            *(f"ema_{period}" for period in ema_periods))
+
+    batch = []
+    for row in values.tolist():
+        results = _empty_results(sma_periods, ema_periods)
+        results.update(zip(keys, map(_as_float, row)))
+        batch.append(results)
+    return batch
+
+def calculate_technical_indicators_many(dfs: Iterable[Optional[pd.DataFrame]],
+                                        **params) -> List[Dict[str, Optional[float]]]:
+    """
+    Calculates the latest technical indicators for many coins' OHLC DataFrames at once.
+
+    The close, high and low columns (any letter case) are stacked into NaN-padded
+    arrays and computed with calculate_indicators_batch. A DataFrame that is None,
+    empty or has no close prices gets an all-None result, and one without high/low
+    prices gets no ADX, as with calculate_technical_indicators. Keyword arguments
+    are the indicator parameters of calculate_indicators_batch.
+    """
+    prices = []
+    for df in dfs:
+        columns = {str(col).lower(): col for col in df.columns} if df is not None else {}
+        if df is None or df.empty or 'close' not in columns:
+            prices.append(None)
+            continue
+        close = _price_array(df[columns['close']])
+        if 'high' in columns and 'low' in columns:
+            prices.append((close, _price_array(df[columns['high']]), _price_array(df[columns['low']])))
+        else:
+            nan = np.full(close.shape, np.nan)
+            prices.append((close, nan, nan))
+
+    n_bars = max((len(bars[0]) for bars in prices if bars is not None), default=0)
+    closes, highs, lows = (np.full((len(prices), n_bars), np.nan) for _ in range(3))
+    for i, bars in enumerate(prices):
+        if bars is not None:
+            for array, values in zip((closes, highs, lows), bars):
+                array[i, n_bars - len(values):] = values  # Pad at the start, keeping the latest bars aligned
+    return calculate_indicators_batch(closes, highs, lows, **params)
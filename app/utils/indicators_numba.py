@@ -0,0 +1,206 @@
+"""
+Compiled kernels for the latest technical indicator values.
+
+Each kernel streams the price arrays once and returns only the final values.
+They are decorated with app.utils._njit.njit, so they compile to native code
+when Numba is installed and run as plain Python otherwise.
+"""
+
+import math
+import numpy as np
+from typing import Tuple
+
+from app.utils._njit import njit, prange
+
+@njit(cache=True)
+def fused_last(closes: np.ndarray, ema_periods: np.ndarray, rsi_length: int, macd_fast: int,
+               macd_slow: int, macd_signal: int) -> Tuple[float, np.ndarray, float, float, float]:
+    """
+    Latest RSI, EMAs and MACD of a price array in a single pass.
+
+    RSI uses Wilder's smoothing: the first average gain/loss is the simple mean of
+    the first `rsi_length` changes, after that each average is updated with weight
+    1/rsi_length. It is NaN when there are not enough prices or the price never moved.
+
+    Every EMA (including the MACD fast/slow EMAs and signal line) is seeded with
+    the first value and uses alpha = 2 / (span + 1), matching pandas'
+    ewm(span=..., adjust=False). An EMA is NaN with fewer prices than its period,
+    as the seed would still dominate it. Returns (rsi, emas, macd, macd_signal, macd_hist).
+    """
+    n = closes.shape[0]
+    n_emas = ema_periods.shape[0]
+    emas = np.empty(n_emas)
+    if n == 0:
+        emas[:] = np.nan
+        return np.nan, emas, np.nan, np.nan, np.nan
+    alphas = 2.0 / (ema_periods + 1.0)
+    fast_alpha = 2.0 / (macd_fast + 1.0)
+    slow_alpha = 2.0 / (macd_slow + 1.0)
+    signal_alpha = 2.0 / (macd_signal + 1.0)
+
+    first = closes[0]
+    emas[:] = first
+    fast = first
+    slow = first
+    signal = 0.0  # The MACD line starts at zero
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, n):
+        close = closes[i]
+        for j in range(n_emas):
+            emas[j] += alphas[j] * (close - emas[j])
+        fast += fast_alpha * (close - fast)
+        slow += slow_alpha * (close - slow)
+        signal += signal_alpha * ((fast - slow) - signal)
+
+        change = close - closes[i - 1]
+        if i <= rsi_length:
+            # Seed: sum the first changes, then turn the sums into averages
+            if change > 0:
+                avg_gain += change
+            else:
+                avg_loss -= change
+            if i == rsi_length:
+                avg_gain /= rsi_length
+                avg_loss /= rsi_length
+        else:
+            gain = change if change > 0 else 0.0
+            loss = -change if change < 0 else 0.0
+            avg_gain += (gain - avg_gain) / rsi_length
+            avg_loss += (loss - avg_loss) / rsi_length
+
+    for j in range(n_emas):
+        if n < ema_periods[j]:
+            emas[j] = np.nan
+
+    if n <= rsi_length:
+        rsi = np.nan
+    elif avg_loss == 0:
+        rsi = 100.0 if avg_gain > 0 else np.nan
+    else:
+        rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    macd = fast - slow
+    return rsi, emas, macd, signal, macd - signal
+
+@njit(cache=True)
+def window_mean(values: np.ndarray, length: int) -> float:
+    """Mean of the last `length` values, summed in float64."""
+    total = 0.0
+    for i in range(values.shape[0] - length, values.shape[0]):
+        total += values[i]
+    return total / length
+
+@njit(cache=True)
+def window_mean_std(values: np.ndarray, length: int) -> Tuple[float, float]:
+    """Mean and population standard deviation of the last `length` values."""
+    mean = window_mean(values, length)
+    squares = 0.0
+    for i in range(values.shape[0] - length, values.shape[0]):
+        deviation = values[i] - mean
+        squares += deviation * deviation
+    return mean, math.sqrt(squares / length)
+
+@njit(cache=True)
+def wilder_adx_last(high: np.ndarray, low: np.ndarray, close: np.ndarray, length: int) -> Tuple[float, float, float]:
+    """
+    Latest ADX, +DI and -DI using Wilder's smoothing.
+
+    True range and directional movement are smoothed with Wilder's running sum
+    (seeded with the sum of the first `length` bars) and ADX with Wilder's
+    average of DX. Returns NaN for values that need more bars than available.
+    """
+    n = close.shape[0]
+    if n <= length:
+        return np.nan, np.nan, np.nan
+    tr_sum = 0.0
+    plus_sum = 0.0
+    minus_sum = 0.0
+    plus_di = 0.0
+    minus_di = 0.0
+    adx = 0.0
+    for i in range(1, n):
+        prev_close = close[i - 1]
+        tr = max(high[i] - low[i], abs(high[i] - prev_close), abs(low[i] - prev_close))
+        up = high[i] - high[i - 1]
+        down = low[i - 1] - low[i]
+        plus_dm = up if up > down and up > 0 else 0.0
+        minus_dm = down if down > up and down > 0 else 0.0
+        if i <= length:
+            tr_sum += tr
+            plus_sum += plus_dm
+            minus_sum += minus_dm
+            if i < length:
+                continue
+        else:
+            tr_sum += tr - tr_sum / length
+            plus_sum += plus_dm - plus_sum / length
+            minus_sum += minus_dm - minus_sum / length
+
+        plus_di = 100.0 * plus_sum / tr_sum if tr_sum > 0 else 0.0
+        minus_di = 100.0 * minus_sum / tr_sum if tr_sum > 0 else 0.0
+        di_sum = plus_di + minus_di
+        dx = 100.0 * abs(plus_di - minus_di) / di_sum if di_sum > 0 else 0.0
+        # DX is available from bar `length`; ADX starts as the mean of the first `length` DX values
+        if i < 2 * length:
+            adx += dx / length
+        else:
+            adx += (dx - adx) / length
+    if n < 2 * length:
+        adx = np.nan
+    return adx, plus_di, minus_di
+
+@njit(cache=True)
+def tail_finite(values: np.ndarray) -> float:
+    """Last finite value of an array, scanning back from the end, or NaN if there is none."""
+    for i in range(values.shape[0] - 1, -1, -1):
+        value = values[i]
+        if value == value and not math.isinf(value):  # value == value is False only for NaN
+            return value
+    return np.nan
+
+# Leading columns of batch_last; the SMA and EMA columns follow in period order
+BATCH_COLUMNS = ("rsi", "macd", "macd_signal", "macd_hist", "bb_upper", "bb_middle", "bb_lower",
+                 "adx", "adx_plus_di", "adx_minus_di")
+
+@njit(cache=True, parallel=True)
+def batch_last(closes: np.ndarray, highs: np.ndarray, lows: np.ndarray, sma_periods: np.ndarray,
+               ema_periods: np.ndarray, rsi_length: int, macd_fast: int, macd_slow: int, macd_signal: int,
+               bbands_length: int, bbands_std: float, adx_length: int) -> np.ndarray:
+    """
+    Latest indicators for every row of NaN-padded (coins, bars) price arrays, one
+    coin per parallel loop iteration.
+
+    Each row uses its non-NaN closes, and the bars with high, low and close for ADX;
+    pass empty (0, bars) highs/lows to skip ADX. Returns a (coins, columns) array in
+    BATCH_COLUMNS order followed by the SMAs and EMAs, with NaN where there is not
+    enough data.
+    """
+    n_coins = closes.shape[0]
+    n_smas = sma_periods.shape[0]
+    first_sma = len(BATCH_COLUMNS)
+    first_ema = first_sma + n_smas
+    out = np.full((n_coins, first_ema + ema_periods.shape[0]), np.nan)
+    with_bars = highs.shape[0] == n_coins and lows.shape[0] == n_coins
+    for c in prange(n_coins):
+        row = closes[c]
+        valid = row[~np.isnan(row)]
+        rsi, emas, macd, signal, hist = fused_last(valid, ema_periods, rsi_length, macd_fast, macd_slow, macd_signal)
+        out[c, 0] = rsi
+        out[c, 1] = macd
+        out[c, 2] = signal
+        out[c, 3] = hist
+        if valid.shape[0] >= bbands_length:
+            middle, std = window_mean_std(valid, bbands_length)
+            out[c, 4] = middle + bbands_std * std
+            out[c, 5] = middle
+            out[c, 6] = middle - bbands_std * std
+        if with_bars:
+            high = highs[c]
+            low = lows[c]
+            complete = ~(np.isnan(high) | np.isnan(low) | np.isnan(row))
+            out[c, 7], out[c, 8], out[c, 9] = wilder_adx_last(high[complete], low[complete], row[complete], adx_length)
+        for k in range(n_smas):
+            if valid.shape[0] >= sma_periods[k]:
+                out[c, first_sma + k] = window_mean(valid, sma_periods[k])
+        out[c, first_ema:] = emas
+    return out
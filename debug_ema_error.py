@@ -1,20 +1,54 @@
 import asyncio
+import functools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
 import pandas as pd
-import pandas_ta as ta
 from app.services.coin_gecko_service import get_historical_market_data
+from app.utils.indicators import calculate_technical_indicators
+
+# Market data fetched by earlier runs, one parquet file per coin, request and UTC day
+CACHE_DIR = Path(".cache")
+
+def parquet_cached(fetch):
+    """
+    Caches the DataFrames returned by a market data fetch function as parquet files in
+    CACHE_DIR, so repeated debug runs on the same day read them from disk instead of
+    calling the API. Without a parquet engine (pyarrow) nothing is written.
+    """
+    @functools.wraps(fetch)
+    async def wrapper(coin_id: str, vs_currency: str = "usd", days: int = 365):
+        today = datetime.now(timezone.utc).date()
+        path = CACHE_DIR / f"{coin_id}_{vs_currency}_{days}_{today}.parquet"
+        if path.exists():
+            return pd.read_parquet(path, memory_map=True)
+        df = await fetch(coin_id=coin_id, vs_currency=vs_currency, days=days)
+        if df is not None and not df.empty:
+            try:
+                CACHE_DIR.mkdir(exist_ok=True)
+                df.to_parquet(path)
+            except ImportError:
+                pass  # No parquet engine installed
+        return df
+    return wrapper
+
+fetch_market_data = parquet_cached(get_historical_market_data)
 
 async def debug_ema_calculation(coin_id: str = "bitcoin", days: int = 365):
     """
     Debug the EMA calculation error by examining the data and calculation process.
+    Returns the fetched DataFrame, or None if no data could be fetched.
     """
     print(f"Debugging EMA calculation for {coin_id} with {days} days of data...")
 
     # 1. Fetch historical market data
-    ohlcv_df = await get_historical_market_data(coin_id=coin_id, vs_currency="usd", days=days)
+    ohlcv_df = await fetch_market_data(coin_id=coin_id, vs_currency="usd", days=days)
 
     if ohlcv_df is None or ohlcv_df.empty:
         print(f"Could not fetch or process historical market data for {coin_id}.")
-        return
+        return None
 
     # 2. Print data info
     print("\nDataFrame Info:")
@@ -23,28 +57,12 @@ async def debug_ema_calculation(coin_id: str = "bitcoin", days: int = 365):
     print(f"Data types: {ohlcv_df.dtypes}")
     print(f"Any NaN values: {ohlcv_df.isna().any().any()}")
 
-    # 3. Try calculating EMA with different approaches
-    print("\nAttempting EMA calculations with different approaches...")
-
-    # Approach 1: Using pandas_ta directly
+    # 3. Calculate the EMA with pandas directly
+    # The close prices come from the API as floats, so convert them once without copying
+    assert pd.api.types.is_numeric_dtype(ohlcv_df['close']), "Expected numeric close prices"
+    ohlcv_df['close'] = ohlcv_df['close'].astype('float64', copy=False)
     try:
-        print("\nApproach 1: Using pandas_ta directly")
-        ema_series = ohlcv_df.ta.ema(length=55)
-        if ema_series is not None and not ema_series.empty:
-            last_ema = ema_series.dropna().iloc[-1]
-            print(f"Last EMA 55 value: {last_ema}")
-            print(f"Type of last_ema: {type(last_ema)}")
-            # Try explicit conversion
-            ema_float = float(last_ema)
-            print(f"Converted to float: {ema_float}")
-        else:
-            print("EMA series is None or empty")
-    except Exception as e:
-        print(f"Error in Approach 1: {e}")
-
-    # Approach 2: Using pandas directly
-    try:
-        print("\nApproach 2: Using pandas directly")
+        print("\nCalculating EMA 55 with pandas ewm")
         ema_pd = ohlcv_df['close'].ewm(span=55, adjust=False).mean()
         last_ema_pd = ema_pd.iloc[-1]
         print(f"Last EMA 55 value (pandas): {last_ema_pd}")
@@ -53,41 +71,38 @@ async def debug_ema_calculation(coin_id: str = "bitcoin", days: int = 365):
         ema_pd_float = float(last_ema_pd)
         print(f"Converted to float: {ema_pd_float}")
     except Exception as e:
-        print(f"Error in Approach 2: {e}")
-
-    # Approach 3: Manual calculation with explicit type conversion
-    try:
-        print("\nApproach 3: Manual calculation with explicit type conversion")
-        # Ensure close column is numeric
-        ohlcv_df['close'] = pd.to_numeric(ohlcv_df['close'], errors='coerce')
-        # Drop any NaN values
-        ohlcv_df_clean = ohlcv_df.dropna(subset=['close'])
-        # Calculate EMA
-        ema_manual = ohlcv_df_clean['close'].ewm(span=55, adjust=False).mean()
-        last_ema_manual = ema_manual.iloc[-1]
-        print(f"Last EMA 55 value (manual): {last_ema_manual}")
-        print(f"Type of last_ema_manual: {type(last_ema_manual)}")
-        # Try explicit conversion
-        ema_manual_float = float(last_ema_manual)
-        print(f"Converted to float: {ema_manual_float}")
-    except Exception as e:
-        print(f"Error in Approach 3: {e}")
+        print(f"Error calculating EMA: {e}")
 
     # 4. Check the last few values of the close column
     print("\nLast 5 values of 'close' column:")
     print(ohlcv_df['close'].tail(5))
     print(f"Types of last 5 values: {[type(x) for x in ohlcv_df['close'].tail(5).values]}")
+    return ohlcv_df
 
 async def test_multiple_coins():
     """Test EMA calculation with multiple coins to find the problematic one."""
     coins = ["bitcoin", "ethereum", "ripple", "cardano", "solana", "dogecoin", "shiba-inu"]
+    frames = {}
 
     for coin in coins:
         print(f"\n{'='*50}\nTesting {coin}\n{'='*50}")
         try:
-            await debug_ema_calculation(coin, days=90)  # Use fewer days for faster testing
+            ohlcv_df = await debug_ema_calculation(coin, days=90)  # Use fewer days for faster testing
+            if ohlcv_df is not None:
+                frames[coin] = ohlcv_df
         except Exception as e:
             print(f"Error with {coin}: {e}")
 
+    if not frames:
+        return
+
+    # Indicator calculation is CPU-bound once the data is fetched, so spread the coins over processes
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        indicator_results = list(executor.map(calculate_technical_indicators, frames.values()))
+    print(f"\nCalculated indicators for {len(frames)} coins in {time.perf_counter() - start:.3f}s")
+    for coin, indicators in zip(frames, indicator_results):
+        print(f"{coin}: EMA 55 = {indicators.get('ema_55')}")
+
 if __name__ == "__main__":
     asyncio.run(test_multiple_coins())
@@ -0,0 +1,80 @@
+import numpy as np
+
+from app.utils.confidence import calculate_confidence_score, calculate_confidence_score_batch
+
+def test_batch_matches_single_scoring():
+    """
+    Test that batch confidence scoring gives the same results as scoring each asset separately.
+    """
+    bullish_indicators = {
+        'rsi': 55,
+        'macd': 0.5,
+        'macd_signal': 0.2,
+        'macd_hist': 0.3,
+        'bb_upper': 110,
+        'bb_middle': 100,
+        'bb_lower': 90,
+        'sma_50': 98,
+        'adx': 25,
+        'adx_plus_di': 20,
+        'adx_minus_di': 15,
+        'ema_9': 102,
+        'ema_21': 101,
+        'ema_55': 100
+    }
+    bearish_indicators = bullish_indicators.copy()
+    bearish_indicators.update({'rsi': 75, 'macd': -0.5, 'macd_hist': -0.7,
+                               'ema_9': 98, 'ema_21': 99, 'ema_55': 100})
+    sparse_indicators = {'rsi': 25, 'sma_50': None}
+
+    tech_indicators_list = [bullish_indicators, bearish_indicators, sparse_indicators]
+    prices = [105, 95, None]
+    market_context = {
+        'fear_greed': {'value': '25', 'value_classification': 'Extreme Fear'},
+        'global_market': {'market_cap_change_percentage_24h_usd': 3.5}
+    }
+    twitter_sentiments = [{'overall_sentiment': 'bullish', 'key_tweets': ['a', 'b', 'c']}, None, None]
+
+    batch = calculate_confidence_score_batch(tech_indicators_list, prices, market_context, twitter_sentiments)
+    assert len(batch) == len(tech_indicators_list)
+
+    for tech_indicators, price, twitter_sentiment, result in zip(tech_indicators_list, prices, twitter_sentiments, batch):
+        single = calculate_confidence_score(tech_indicators, price, market_context, twitter_sentiment)
+        print(f"Direction: {result['direction']}, Signal: {result['signal']}, Confidence: {result['overall_score']}")
+        assert result['overall_score'] == single['overall_score']
+        assert result['direction'] == single['direction']
+        assert result['signal'] == single['signal']
+        assert result['factor_scores'] == single['factor_scores']
+        assert sorted(result['supporting_indicators']) == sorted(single['supporting_indicators'])
+        assert sorted(result['conflicting_indicators']) == sorted(single['conflicting_indicators'])
+        # Notes are unique as built, without a de-duplication pass
+        notes = result['supporting_indicators'] + result['conflicting_indicators']
+        assert len(notes) == len(set(notes))
+
+    # Too few indicators to score: neutral HOLD with no factor scores
+    assert batch[2]['overall_score'] == 0 and batch[2]['signal'] == 'HOLD'
+    assert batch[2]['factor_scores'] == {}
+
+    # Without notes, only the indicator lists differ
+    for result, quiet in zip(batch, calculate_confidence_score_batch(tech_indicators_list, prices, market_context,
+                                                                     twitter_sentiments, verbose=False)):
+        assert quiet['supporting_indicators'] == [] and quiet['conflicting_indicators'] == []
+        assert quiet['overall_score'] == result['overall_score']
+        assert quiet['signal'] == result['signal']
+        assert quiet['factor_scores'] == result['factor_scores']
+
+    assert calculate_confidence_score_batch([], []) == []
+
+def test_numpy_price_scores_like_float():
+    """
+    Test that a NumPy price (as taken from a DataFrame's last close) scores like a Python float.
+    """
+    tech_indicators = {'rsi': 55, 'macd': 0.5, 'macd_signal': 0.2, 'macd_hist': 0.3, 'sma_50': 98,
+                       'ema_9': 102, 'ema_21': 101, 'ema_55': 100}
+    expected = calculate_confidence_score(tech_indicators, 105.0)
+    assert calculate_confidence_score(tech_indicators, np.float64(105.0)) == expected
+    assert calculate_confidence_score_batch([tech_indicators], [np.float64(105.0)])[0] == expected
+
+if __name__ == "__main__":
+    test_batch_matches_single_scoring()
+    test_numpy_price_scores_like_float()
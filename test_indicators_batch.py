@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.utils import indicators
+from app.utils.indicators_batch import calculate_indicators_batch, calculate_technical_indicators_many
+from app.utils.indicators_numba import BATCH_COLUMNS, batch_last
+
+def _batch_prices():
+    """Close, high and low prices of three coins, as (coins, bars) arrays padded with NaN."""
+    rng = np.random.default_rng(7)
+    closes = np.full((3, 120), np.nan)
+    closes[0] = 100 + np.cumsum(rng.normal(size=120))
+    closes[1, :80] = 20 + np.cumsum(rng.normal(size=80)) * 0.1  # Shorter history, padded with NaN
+    closes[1, 10] = np.nan  # Missing bar inside the history
+    closes[2, :10] = np.arange(10.0)  # Too few bars for most indicators
+    return closes, closes + 1, closes - 1
+
+def test_batch_matches_single_indicators(monkeypatch):
+    """
+    Test that batch indicators match calculate_technical_indicators for each coin's DataFrame.
+    """
+    closes, highs, lows = _batch_prices()
+
+    batch = calculate_indicators_batch(closes, highs, lows)
+    assert len(batch) == len(closes)
+
+    frames = [pd.DataFrame({'Open': close, 'High': high, 'Low': low, 'Close': close},
+                           index=pd.date_range('2024-01-01', periods=len(close)))
+              for close, high, low in zip(closes, highs, lows)]
+    frames[1] = frames[1].iloc[:80]  # Without the padding
+    frames.append(frames[0][['Close']])  # No highs/lows, no ADX
+    many = calculate_technical_indicators_many([*frames, None])
+
+    # The batch uses the kernels, so compare with the kernel path of the single-coin function
+    monkeypatch.setattr(indicators, "ta", None)
+    monkeypatch.setattr(indicators, "talib", None)
+    for i, df in enumerate(frames):
+        single = indicators._compute_technical_indicators(indicators._normalized_prices(df), (50,), (9, 21, 55),
+                                                          20, 2, 8, 17, 9, 14)
+        assert many[i] == single
+        if i < len(batch):
+            assert batch[i] == single
+    assert many[-2]['adx'] is None and many[-2]['rsi'] == batch[0]['rsi']
+    assert all(value is None for value in many[-1].values())
+
+    assert batch[2]['sma_50'] is None and batch[2]['rsi'] is None
+
+    # float32 prices give the same indicators to within float32 precision
+    batch32 = calculate_indicators_batch(closes.astype(np.float32), highs.astype(np.float32),
+                                         lows.astype(np.float32))
+    for result, result32 in zip(batch, batch32):
+        for key, value in result.items():
+            if value is None:
+                assert result32[key] is None
+            else:
+                assert np.isclose(result32[key], value, rtol=1e-4, atol=1e-4), key
+
+def test_batch_kernel_matches_batch_indicators():
+    """
+    Test the parallel batch_last kernel directly against calculate_indicators_batch.
+    Without Numba the kernel runs as plain Python and the batch uses the vectorized
+    per-coin path, so the two agree to rounding; with Numba they are the same code.
+    """
+    closes, highs, lows = _batch_prices()
+    values = batch_last(closes, highs, lows, np.array([50], dtype=np.int64), np.array([9.0, 21.0, 55.0]),
+                        14, 8, 17, 9, 20, 2, 14)
+    keys = (*BATCH_COLUMNS, "sma_50", "ema_9", "ema_21", "ema_55")
+    assert values.shape == (len(closes), len(keys))
+
+    for row, results in zip(values, calculate_indicators_batch(closes, highs, lows)):
+        for key, value in zip(keys, row):
+            if results[key] is None:
+                assert np.isnan(value), key
+            else:
+                assert np.isclose(value, results[key], rtol=1e-12, atol=1e-12), key
+
+if __name__ == "__main__":
+    pytest.main([__file__])
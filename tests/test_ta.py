@@ -0,0 +1,114 @@
+"""
+Technical analysis checks against live CoinGecko data.
+
+They call the upstream services, so they only run with RUN_NETWORK_TESTS set,
+e.g. RUN_NETWORK_TESTS=1 pytest tests/test_ta.py -s. Each (coin, days) analysis
+is fetched once per test session and shared by every test that needs it, so the
+indicators and confidence report for the same coin do not hit the upstream
+services again.
+"""
+
+import asyncio
+import os
+from typing import get_args
+
+import pytest
+
+from app.services.technical_analysis_service import get_technical_analysis
+from app.utils.confidence import TradingSignal
+
+pytestmark = pytest.mark.skipif(not os.getenv("RUN_NETWORK_TESTS"),
+                                reason="needs network access; set RUN_NETWORK_TESTS=1 to run")
+
+# Indicators every analysis reports, with enough history for all of them
+INDICATOR_KEYS = ('rsi', 'macd', 'macd_signal', 'macd_hist', 'sma_50', 'bb_upper', 'bb_middle', 'bb_lower',
+                  'adx', 'adx_plus_di', 'adx_minus_di', 'ema_9', 'ema_21', 'ema_55')
+
+# Coins for the multi-coin indicator check
+COINS = ["bitcoin", "ethereum", "ripple", "cardano", "solana"]
+
+@pytest.fixture(scope="session")
+def ta_results():
+    """Returns a function fetching the technical analysis for (coin, days), once per session."""
+    results = {}
+
+    def fetch(coin_id: str, days: int):
+        if (coin_id, days) not in results:
+            results[coin_id, days] = asyncio.run(get_technical_analysis(coin_id, days=days))
+        analysis = results[coin_id, days]
+        if not analysis:
+            pytest.skip(f"Technical analysis failed for {coin_id}")
+        return analysis
+
+    return fetch
+
+def _check_confidence(confidence):
+    """Checks that a confidence report has a 0-100 score, a direction and a trading signal."""
+    assert 0 <= confidence['overall_score'] <= 100
+    assert confidence['direction'] in {'bullish', 'bearish', 'neutral'}
+    assert confidence['signal'] in get_args(TradingSignal)
+
+def test_technical_indicators(ta_results):
+    """Test the enhanced technical analysis indicators for Bitcoin."""
+    analysis = ta_results("bitcoin", 90)
+    indicators = {k: v for k, v in analysis.items() if k != 'confidence'}
+
+    print("\nTechnical Indicators:")
+    for key, value in indicators.items():
+        print(f"{key}: {value}")
+
+    missing = [key for key in INDICATOR_KEYS if indicators.get(key) is None]
+    assert not missing, f"No value for {missing}"
+    assert 0 <= indicators['rsi'] <= 100
+    assert indicators['bb_lower'] <= indicators['bb_middle'] <= indicators['bb_upper']
+
+def test_confidence_and_signal(ta_results):
+    """Test confidence score and trading signal generation for Bitcoin."""
+    confidence = ta_results("bitcoin", 90).get('confidence', {})
+
+    print("\nConfidence Analysis:")
+    print(f"Overall Score: {confidence.get('overall_score')}")
+    print(f"Direction: {confidence.get('direction')}")
+    print(f"Signal: {confidence.get('signal')}")
+    _check_confidence(confidence)
+
+    # Print supporting and conflicting indicators
+    print("\nSupporting Indicators:")
+    for indicator in confidence.get('supporting_indicators', []):
+        print(f"- {indicator}")
+
+    print("\nConflicting Indicators:")
+    for indicator in confidence.get('conflicting_indicators', []):
+        print(f"- {indicator}")
+
+    # Print factor scores
+    print("\nFactor Scores:")
+    for factor, score in confidence.get('factor_scores', {}).items():
+        print(f"{factor}: {score}")
+
+@pytest.mark.parametrize("coin_id", COINS)
+def test_indicator_calculations(ta_results, coin_id):
+    """Test the technical analysis with the improved indicator calculations, across coins."""
+    analysis = ta_results(coin_id, 30)  # Use fewer days to avoid rate limiting
+
+    # Check if EMA 55 was calculated successfully
+    print(f"EMA 55: {analysis.get('ema_55')}")
+
+    # Check other key indicators
+    print(f"RSI: {analysis.get('rsi')}")
+    print(f"MACD: {analysis.get('macd')}")
+    print(f"MACD Signal: {analysis.get('macd_signal')}")
+    print(f"MACD Hist: {analysis.get('macd_hist')}")
+
+    # Check confidence score
+    confidence = analysis.get('confidence', {})
+    print(f"Confidence Score: {confidence.get('overall_score')}")
+    print(f"Direction: {confidence.get('direction')}")
+    print(f"Signal: {confidence.get('signal')}")
+
+    assert analysis['ema_55'] is not None
+    assert analysis['rsi'] is not None and analysis['macd'] is not None
+    _check_confidence(confidence)
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-s"])